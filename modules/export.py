@@ -0,0 +1,155 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Machine-readable export of the simulation,
+	written while the scoreboard runs: every
+	committed change as a JSON Lines record, and
+	the instruction status table as CSV rows.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+import csv
+import json
+
+class TraceExporter:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Change sink of the scoreboard (see the "change_sink"
+		argument of "Scoreboard"), which writes:
+
+		- To "jsonl_file" (if given), one JSON record per change,
+		  in clock order:
+
+		  {"clock": c, "pc": pc, "stage": stage_label}
+			when an instruction completes a pipeline stage;
+
+		  {"clock": c, "functional_unit": label, "replica": id,
+		   "field": field_label, "value": value}
+			when a functional unit field changes;
+
+		  {"clock": c, "register": label, "value": value}
+			when a register result status changes.
+
+		  Values follow the "Scoreboard.run" format, with
+		  (functional unit label, replica id) pairs as lists.
+
+		- To "csv_file" (if given), a "pc" column followed by a
+		  column for each pipeline stage, with a row for every
+		  instruction in program order, written as soon as the
+		  instruction (and every one before it) completes.
+
+		If "program_column" is set, every record and row also
+		hold the program given to "TraceExporter.start", so the
+		traces of several programs may share the same files.
+
+		Just the rows of instructions still waiting for older
+		ones are kept, so the memory used is bounded by the
+		instruction window.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	def __init__(self,
+		pipeline_stages,
+		word_size,
+		jsonl_file=None,
+		csv_file=None,
+		program_column=False):
+
+		self.pipeline_stages = pipeline_stages
+		self.word_size = word_size
+		self.jsonl_file = jsonl_file
+		self.program_column = program_column
+
+		self.__csv_writer = None
+		if csv_file is not None:
+			self.__csv_writer = csv.writer(csv_file)
+			self.__csv_writer.writerow((["program"] if program_column else []) +\
+				["pc"] + list(pipeline_stages))
+
+		self.__json_encoder = json.JSONEncoder(separators=(",", ":"))
+
+		self.start()
+
+	def start(self, program=None):
+		"""
+			Start the trace of a new program.
+		"""
+		self.program = program
+
+		# Instruction status of the completed instructions
+		# not written yet, and the PC of the next one to be
+		# written
+		self.__pending_rows = {}
+		self.__next_pc = 0
+
+		# Stages completed so far by every instruction
+		# still in flight
+		self.__inst_status = {}
+
+	def __write_record(self, record):
+		if self.program_column:
+			record["program"] = self.program
+
+		self.jsonl_file.write(self.__json_encoder.encode(record) + "\n")
+
+	def stage(self, clock, inst_pc, stage_label):
+		"""
+			The given instruction completed the given pipeline
+			stage in the given clock cycle.
+		"""
+		if self.jsonl_file is not None:
+			self.__write_record({
+				"clock" : clock,
+				"pc" : inst_pc,
+				"stage" : stage_label,
+			})
+
+		if self.__csv_writer is None:
+			return
+
+		inst_status = self.__inst_status.setdefault(inst_pc, {})
+		inst_status[stage_label] = clock
+
+		if stage_label != self.pipeline_stages[-1]:
+			return
+
+		# Instruction completed: write it, alongside every
+		# completed instruction right after it, as soon as
+		# every older instruction is written
+		self.__pending_rows[inst_pc] = self.__inst_status.pop(inst_pc)
+
+		while self.__next_pc in self.__pending_rows:
+			inst_status = self.__pending_rows.pop(self.__next_pc)
+
+			self.__csv_writer.writerow(\
+				([self.program] if self.program_column else []) +\
+				[self.__next_pc] +\
+				[inst_status.get(stage_label)
+					for stage_label in self.pipeline_stages])
+
+			self.__next_pc += self.word_size
+
+	def field(self, clock, replica_key, field, value):
+		"""
+			The given field of the given functional unit replica
+			changed to the given value in the given clock cycle.
+		"""
+		if self.jsonl_file is not None:
+			self.__write_record({
+				"clock" : clock,
+				"functional_unit" : replica_key[0],
+				"replica" : replica_key[1],
+				"field" : field,
+				"value" : value,
+			})
+
+	def register(self, clock, register_label, value):
+		"""
+			The result status of the given register changed
+			to the given value in the given clock cycle.
+		"""
+		if self.jsonl_file is not None:
+			self.__write_record({
+				"clock" : clock,
+				"register" : register_label,
+				"value" : value,
+			})
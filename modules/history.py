@@ -0,0 +1,321 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Columnar log of every change committed to
+	the scoreboard during the simulation, used
+	to reconstruct the whole scoreboard state
+	(functional unit and register result status)
+	at any given clock cycle.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+class ScoreboardHistory:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Every change is a row of four columns:
+
+		clock:		clock cycle of the change.
+		replica:	index of the functional unit replica
+				which made the change.
+		field:		id of the changed field. Ids below
+				len(FIELDS) are functional unit fields
+				(in the FIELDS order), and the others
+				are the register result status of the
+				register id (field - len(FIELDS)).
+		value:		new value, encoded as an integer.
+
+		Rows are appended in clock order. Every time
+		"snapshot_interval" rows are appended, a copy
+		of the whole (encoded) scoreboard state is kept
+		alongside the clock it corresponds to, so the
+		state at any clock cycle is a bisect in the
+		snapshot clocks plus a replay of, at most,
+		"snapshot_interval" rows.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	FIELDS = ("busy", "op", "f_i", "f_j", "f_k", "q_j", "q_k", "r_j", "r_k")
+
+	# Field ids by field label
+	FIELD_IDS = {field : field_id for field_id, field in enumerate(FIELDS)}
+
+	# Encoded value kinds of each functional unit field.
+	# Registers result status are encoded just like "q_j"
+	# and "q_k" fields.
+	FIELD_KINDS = {
+		"busy" : "flag", "r_j" : "flag", "r_k" : "flag",
+		"op" : "pc",
+		"f_i" : "register", "f_j" : "register", "f_k" : "register",
+		"q_j" : "producer", "q_k" : "producer",
+	}
+
+	def __init__(self, replica_keys, register_labels, snapshot_interval=4096):
+		# (functional unit label, replica id) pair of each
+		# functional unit replica, indexed by replica index
+		self.replica_keys = replica_keys
+
+		# Register label of each register id. This list may
+		# grow while the simulation runs.
+		self.register_labels = register_labels
+
+		self.snapshot_interval = snapshot_interval
+
+		# Change log columns
+		self.clock = array("q")
+		self.replica = array("l")
+		self.field = array("l")
+		self.value = array("q")
+
+		# Register ids changed at least once
+		self.changed_register_ids = set()
+
+		# How many architecture registers were never touched at
+		# all (so they have no register id), set by the scoreboard
+		# by the end of the simulation
+		self.untouched_register_count = 0
+
+		# Current (encoded) state: fields of each functional
+		# unit replica, followed by each register result status
+		self.__cur_state = array("q")
+		for replica_index in range(len(self.replica_keys)):
+			self.__cur_state.extend([
+				self.encode(field, value)
+				for field, value in zip(self.FIELDS,
+					(False, None, None, None, None, None, None, True, True))
+			])
+
+		self.__base_state_len = len(self.__cur_state)
+
+		# Snapshot index, with the snapshot at clock -1 being
+		# the initial scoreboard state
+		self.snapshot_clocks = [-1]
+		self.snapshot_rows = [0]
+		self.snapshot_states = [array("q", self.__cur_state)]
+
+	def encode(self, field, value):
+		"""
+			Encode a functional unit field (or register result
+			status, if "field" is None) value as an integer.
+			Registers are expected as register ids and producers
+			as functional unit replica records.
+		"""
+		kind = self.FIELD_KINDS[field] if field is not None else "producer"
+
+		if kind == "producer":
+			if value is None:
+				return -2
+			return value.index if value else -1
+
+		if value is None:
+			return -1
+
+		return int(value)
+
+	def decode(self, field, code):
+		"""
+			Decode an integer value of a functional unit field
+			(or register result status, if "field" is None)
+			back to its public format: register labels and
+			(functional unit label, replica id) pairs.
+		"""
+		kind = self.FIELD_KINDS[field] if field is not None else "producer"
+
+		if kind == "producer":
+			if code == -2:
+				return None
+			return self.replica_keys[code] if code >= 0 else 0
+
+		if code == -1:
+			return None
+
+		if kind == "flag":
+			return code == 1
+
+		if kind == "register":
+			return self.register_labels[code]
+
+		return code
+
+	def __grow_state(self, state):
+		# Registers interned after the state was created
+		# have never been changed (result status 0)
+		missing = self.__base_state_len + len(self.register_labels) - len(state)
+		if missing > 0:
+			state.extend([-1] * missing)
+
+	def log(self, clock, replica, field, value):
+		"""
+			Append a functional unit field change.
+		"""
+		field_id = self.FIELD_IDS[field]
+		code = self.encode(field, value)
+
+		self.clock.append(clock)
+		self.replica.append(replica.index)
+		self.field.append(field_id)
+		self.value.append(code)
+
+		self.__cur_state[len(self.FIELDS) * replica.index + field_id] = code
+
+	def log_register(self, clock, replica, register_id, value):
+		"""
+			Append a register result status change.
+		"""
+		field_id = len(self.FIELDS) + register_id
+		code = self.encode(None, value)
+
+		self.clock.append(clock)
+		self.replica.append(replica.index)
+		self.field.append(field_id)
+		self.value.append(code)
+
+		self.changed_register_ids.update({register_id})
+
+		self.__grow_state(self.__cur_state)
+		self.__cur_state[self.__base_state_len + register_id] = code
+
+	def attach(self,
+		columns,
+		snapshot_clocks,
+		snapshot_rows,
+		snapshot_states,
+		changed_register_ids,
+		untouched_register_count):
+		"""
+			Replace the (empty) change log by the given one, whose
+			columns and snapshots may be any read-only integer
+			sequences (e.g. the memory-mapped columns of a result
+			file, see "modules/resultfile.py"). No changes may be
+			logged afterwards.
+		"""
+		self.clock = columns["clock"]
+		self.replica = columns["replica"]
+		self.field = columns["field"]
+		self.value = columns["value"]
+
+		self.snapshot_clocks = snapshot_clocks
+		self.snapshot_rows = snapshot_rows
+		self.snapshot_states = snapshot_states
+
+		self.changed_register_ids = changed_register_ids
+		self.untouched_register_count = untouched_register_count
+
+	def end_clock(self, clock):
+		"""
+			Mark that all changes of the given clock cycle were
+			logged, taking a new snapshot if needed.
+		"""
+		if len(self.clock) - self.snapshot_rows[-1] >= self.snapshot_interval:
+			self.snapshot_clocks.append(clock)
+			self.snapshot_rows.append(len(self.clock))
+			self.snapshot_states.append(array("q", self.__cur_state))
+
+	def __len__(self):
+		return len(self.clock)
+
+	def clocks(self):
+		"""
+			Sorted list of every clock cycle with changes.
+		"""
+		clocks = []
+		for clock in self.clock:
+			if not clocks or clocks[-1] != clock:
+				clocks.append(clock)
+		return clocks
+
+	def rows_at(self, clock):
+		"""
+			Range of the rows logged in the given clock cycle.
+		"""
+		return range(bisect_left(self.clock, clock),
+			bisect_right(self.clock, clock))
+
+	def changes_at(self, clock):
+		"""
+			Return the set of (replica index, field label) pairs
+			and the set of register ids changed in the given
+			clock cycle.
+		"""
+		changed_fields = set()
+		changed_register_ids = set()
+
+		for row in self.rows_at(clock):
+			field_id = self.field[row]
+			if field_id < len(self.FIELDS):
+				changed_fields.update({(self.replica[row], self.FIELDS[field_id])})
+			else:
+				changed_register_ids.update({field_id - len(self.FIELDS)})
+
+		return changed_fields, changed_register_ids
+
+	def state_at(self, clock):
+		"""
+			Scoreboard state by the end of the given clock cycle.
+		"""
+		snapshot_id = bisect_right(self.snapshot_clocks, clock) - 1
+
+		state = ScoreboardState(self,
+			array("q", self.snapshot_states[snapshot_id]),
+			self.snapshot_rows[snapshot_id],
+			self.snapshot_clocks[snapshot_id])
+
+		state.advance(clock)
+
+		return state
+
+class ScoreboardState:
+	"""
+		Whole scoreboard state (encoded) at a given clock
+		cycle, which can be moved forward cheaply by replaying
+		just the rows logged since then.
+	"""
+	def __init__(self, history, values, row, clock):
+		self.history = history
+		self.values = values
+		self.row = row
+		self.clock = clock
+
+	def advance(self, clock):
+		"""
+			Replay all changes up to (and including) the given
+			clock cycle.
+		"""
+		history = self.history
+		fields_num = len(history.FIELDS)
+		base_state_len = fields_num * len(history.replica_keys)
+
+		missing = base_state_len + len(history.register_labels) - len(self.values)
+		if missing > 0:
+			self.values.extend([-1] * missing)
+
+		while self.row < len(history.clock) and history.clock[self.row] <= clock:
+			field_id = history.field[self.row]
+
+			if field_id < fields_num:
+				self.values[fields_num * history.replica[self.row] + field_id] =\
+					history.value[self.row]
+			else:
+				self.values[base_state_len + field_id - fields_num] =\
+					history.value[self.row]
+
+			self.row += 1
+
+		self.clock = clock
+
+	def func_unit_field(self, replica_index, field):
+		"""
+			Public value of a functional unit replica field.
+		"""
+		history = self.history
+		return history.decode(field, self.values[\
+			len(history.FIELDS) * replica_index + history.FIELD_IDS[field]])
+
+	def register(self, register_id):
+		"""
+			Public value of a register result status.
+		"""
+		history = self.history
+		return history.decode(None, self.values[\
+			len(history.FIELDS) * len(history.replica_keys) + register_id])
@@ -1,4 +1,5 @@
 from colorama import Fore, Style, init as colorama_init
+import sys
 """
 	Module dedicated to produce all program
 	output if option "-nogui" is enabled by the
@@ -12,7 +13,7 @@ class TextualInterface:
 		max_pc = max(ans["inst_status"])
 
 		# Dummy pointers to increase code readability
-		reg_status = ans["reg_dest_status"]
+		history = ans["history"]
 		func_unit_status = ans["func_unit_status"]
 
 		# Order which the instruction status table
@@ -71,11 +72,13 @@ class TextualInterface:
 
 		# Count how many registers are not used ever
 		# using the given instruction input code
-		# sequence (no need to print then)
-		self.__omitted_reg_count = sum([
-			len(reg_status[reg_label]) <= 1
-			for reg_label in reg_status
-		])
+		# sequence (no need to print then), including
+		# the ones never touched by it at all
+		self.__omitted_reg_count = 0
+		if history is not None:
+			self.__omitted_reg_count = history.untouched_register_count +\
+				len(history.register_labels) -\
+				len(history.changed_register_ids)
 
 		# Decoration for functional unit table (horizontal line)
 		self.__FU_HORIZ_LINE = (self.__fu_fill_len_fus + 2 +\
@@ -88,23 +91,107 @@ class TextualInterface:
 			(self.__inst_fill_len + 1) * \
 			len(self.__inst_print_order)) * "-"
 
+		"""
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+			START OF Row templates
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		"""
+		# All tables are built into this buffer (a list
+		# of strings), which is written to the standard
+		# output at once, and then reused
+		self.__out = []
+
+		# (changed, unchanged) cell colors, and the color reseter
+		self.__COLORS = (Fore.GREEN, Fore.RED)
+		self.__COLOR_RESETER = Style.RESET_ALL
+
+		# Instruction status table header, and PC column
+		# of every instruction row
+		self.__INST_HEADER = self.__INST_HORIZ_LINE + "\n" +\
+			"{val:<{fill}}".format(val="PC", fill=self.__max_pc_len) + ":" +\
+			"".join("{:^{fill}}".format(print_label,
+				fill=self.__inst_fill_len) + "|"
+				for print_label in self.__inst_print_order) +\
+			"\n" + self.__INST_HORIZ_LINE + "\n"
+
+		self.__inst_sorted_pcs = sorted(ans["inst_status"])
+		self.__inst_row_labels = {
+			pc : "{val:<{fill}}".format(val=pc, fill=self.__max_pc_len) + ":"
+			for pc in self.__inst_sorted_pcs
+		}
+
+		self.__inst_cell = ("{:^" + str(self.__inst_fill_len) + "}").format
+
+		# Functional unit status table header, replica column
+		# of every functional unit row and cell format of every
+		# field
+		self.__FU_HEADER = self.__FU_HORIZ_LINE + "\n" +\
+			"{val:<{fill}}".format(val="Functional unit",
+				fill=self.__fu_fill_len_fus) + ": " +\
+			"".join("{:^{fill}}".format(print_label,
+				fill=self.__fu_fill_custom_spacing[print_label]) + "|"
+				for print_label in self.__fu_print_order) +\
+			"\n" + self.__FU_HORIZ_LINE + "\n"
+
+		self.__fu_row_labels = {
+			(func_unit_label, replica_id) : "{val:<{fill}}".format(\
+				val=(func_unit_label + "_" + str(replica_id)),
+				fill=self.__fu_fill_len_fus) + ": "
+			for func_unit_label in func_unit_status
+			for replica_id in func_unit_status[func_unit_label]
+		}
+
+		self.__fu_field_order = {
+			table_label : field_order
+			for field_order, table_label in enumerate(self.__fu_print_order)
+		}
+
+		self.__fu_cells = [
+			(table_label, ("{:^" +\
+				str(self.__fu_fill_custom_spacing[table_label]) + "}").format)
+			for table_label in self.__fu_print_order
+		]
+
+		# Destiny register status table footer
+		self.__REG_FOOTER = "\n"
+		if self.__omitted_reg_count > 0:
+			self.__REG_FOOTER = "[...] (More " +\
+				str(self.__omitted_reg_count) + " omitted registers)\n"
+		"""
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+			END OF Row templates
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		"""
+
+	def __flush(self):
+		"""
+			Write everything built into the output buffer
+			with a single write, and clear the buffer.
+		"""
+		sys.stdout.write("".join(self.__out))
+		self.__out.clear()
+
 	def __inst_status_table(self, 
 		inst_status, 
 		clock, 
-		colored=True):
+		colored=True,
+		pcs=None):
+
+		out = self.__out
+		inst_cell = self.__inst_cell
+
+		if colored:
+			changed_color, unchanged_color = self.__COLORS
+			color_reseter = self.__COLOR_RESETER
+		else:
+			changed_color = unchanged_color = color_reseter = ""
 
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			START OF Instruction status table Header
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
-		print(self.__INST_HORIZ_LINE)
-		print("{val:<{fill}}".format(val="PC", 
-			fill=self.__max_pc_len), end=":")
-		for print_label in self.__inst_print_order:
-			print("{:^{fill}}".format(\
-				print_label, fill=self.__inst_fill_len), end="|")
-		print("\n", self.__INST_HORIZ_LINE, sep="")
+		out.append(self.__INST_HEADER)
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			END OF Instruction status table Header
@@ -113,68 +200,26 @@ class TextualInterface:
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
 
-		for pc in sorted(list(inst_status.keys())):
-			print("{val:<{fill}}".format(val=pc, fill=self.__max_pc_len), end=":")
-			for stage_id in range(len(self.__inst_print_order)):
-				val=inst_status[pc][self.__inst_print_order[stage_id]]
-				if colored:
-					color = Fore.RED if clock != val else Fore.GREEN
-					color_reseter = Style.RESET_ALL
-				else:
-					color = ""
-					color_reseter = ""
-
-				print(color + \
-					"{:^{fill}}".format(val if val <= clock else "", 
-					fill=self.__inst_fill_len) + color_reseter, end="|")
-			print()
+		# Just the given instructions, if any, instead of
+		# every instruction
+		if pcs is None:
+			pcs = self.__inst_sorted_pcs
+
+		for pc in pcs:
+			out.append(self.__inst_row_labels[pc])
+			cur_inst_status = inst_status[pc]
+			for print_label in self.__inst_print_order:
+				val = cur_inst_status[print_label]
+				out.append((changed_color if clock == val else unchanged_color) +\
+					inst_cell(val if val <= clock else "") +\
+					color_reseter + "|")
+			out.append("\n")
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			END OF Instruction status table body
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
-		print(self.__INST_HORIZ_LINE)
-
-	def __update_print_indexes(self, 
-		cur_func_unit_status,
-		cur_update_timers,
-		func_unit_print_index,
-		index_holder, 
-		reg_index_holder,
-		func_unit_label, 
-		replica_id,
-		this_clock_updated_regs,
-		clock):
-		"""
-			This method synchronize the counters of each
-			functional unit output metadata and the fields
-			metadata. 
-
-			I've had a hard time because I wasn't remembering 
-			that these counters are different. The same logic must 
-			be applied to the register status table, so watch out
-			for this very important detail.
-		"""
-		# Functional unit print index update
-		if func_unit_print_index < len(cur_update_timers)-1 and\
-			cur_update_timers[func_unit_print_index+1]["clock"] <= clock:
-			index_holder[func_unit_label][replica_id]["func_unit_print_index"] += 1
-			func_unit_print_index += 1
-
-		# Field print index update
-		if cur_update_timers[func_unit_print_index]["clock"] == clock:
-			for changed_field_label in cur_update_timers[func_unit_print_index]["changed_fields"]:
-				if index_holder[func_unit_label][replica_id]\
-					["field_index"][changed_field_label] < \
-					len(cur_func_unit_status[changed_field_label])-1:
-					index_holder[func_unit_label][replica_id]\
-						["field_index"][changed_field_label] += 1
-
-			for changed_reg_label in cur_update_timers[func_unit_print_index]["changed_registers"]:
-				reg_index_holder[changed_reg_label] += 1
-				this_clock_updated_regs.update({changed_reg_label})
-
-		return func_unit_print_index
+		out.append(self.__INST_HORIZ_LINE + "\n")
 
 	def __prepare_value(self, val, none_symbol="-"):
 		"""
@@ -199,28 +244,24 @@ class TextualInterface:
 		
 
 	def __func_unit_table(self, 
-		func_unit_status, 
-		clock, 
-		index_holder, 
-		reg_index_holder,
+		state, 
+		changed_fields, 
 		colored=True):
 
-		this_clock_updated_regs = set()
+		out = self.__out
+
+		if colored:
+			changed_color, unchanged_color = self.__COLORS
+			color_reseter = self.__COLOR_RESETER
+		else:
+			changed_color = unchanged_color = color_reseter = ""
 
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			START OF Functional unit status table Header
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
-		print(self.__FU_HORIZ_LINE)
-		print("{val:<{fill}}".format(val="Functional unit", 
-			fill=self.__fu_fill_len_fus), end=": ")
-		for print_label in self.__fu_print_order:
-			print("{:^{fill}}".format(\
-				print_label, 
-				fill=self.__fu_fill_custom_spacing[print_label]), 
-				end="|")
-		print("\n", self.__FU_HORIZ_LINE, sep="")
+		out.append(self.__FU_HEADER)
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			END OF Functional unit status table Header
@@ -229,108 +270,103 @@ class TextualInterface:
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
 
-		for func_unit_label in func_unit_status:
-			for replica_id in func_unit_status[func_unit_label]:
-				# Pull off some dummy variables to increase
-				# code readability
-				cur_func_unit_status = func_unit_status\
-					[func_unit_label][replica_id]
-				cur_update_timers = cur_func_unit_status["update_timers"]
-				func_unit_print_index = index_holder[func_unit_label]\
-					[replica_id]["func_unit_print_index"]
-
-				# Update indexes to keep track of current state
-				# of execution
-				func_unit_print_index = self.__update_print_indexes(\
-					cur_func_unit_status,
-					cur_update_timers,
-					func_unit_print_index,
-					index_holder,
-					reg_index_holder,
-					func_unit_label,
-					replica_id,
-					this_clock_updated_regs,
-					clock)
-
-				# Functional unit name concatenated with its
-				# id between each replicas
-				print("{val:<{fill}}".format(\
-					val=(func_unit_label + "_" + str(replica_id)), 
-					fill=self.__fu_fill_len_fus), end=": ")
-
-				# Effectively print this functional unit status fields
-				for table_label in self.__fu_print_order:
-					print_index = index_holder[func_unit_label]\
-						[replica_id]["field_index"][table_label]
-
-					"""
-						~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-						START OF current functional unit field status preparation
-						~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-					"""
-					val = self.__prepare_value(\
-						cur_func_unit_status[table_label][print_index])
-
-					if colored:
-						color = Fore.GREEN if \
-							(table_label in cur_update_timers\
-								[func_unit_print_index]["changed_fields"] and \
-							cur_update_timers[func_unit_print_index]["clock"] == clock)\
-							else Fore.RED
-						color_reseter = Style.RESET_ALL
-					else:
-						color = ""
-						color_reseter = ""
-					"""
-						~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-						END OF current functional unit field status preparation
-						~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-					"""
-
-					print(color + \
-						"{:^{fill}}".format(val if val else " ", 
-						fill=self.__fu_fill_custom_spacing[table_label]) +\
-						color_reseter, end="|")
-				print()
+		for replica_index, replica_key in \
+			enumerate(state.history.replica_keys):
+
+			# Functional unit name concatenated with its
+			# id between each replicas
+			out.append(self.__fu_row_labels[replica_key])
+
+			# Effectively build this functional unit status fields
+			for table_label, fu_cell in self.__fu_cells:
+				val = self.__prepare_value(\
+					state.func_unit_field(replica_index, table_label))
+
+				color = changed_color if \
+					(replica_index, table_label) in changed_fields\
+					else unchanged_color
+
+				out.append(color + fu_cell(val if val else " ") +\
+					color_reseter + "|")
+			out.append("\n")
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			END OF Functional unit status table Body
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
-		print(self.__FU_HORIZ_LINE)
-
-		return this_clock_updated_regs
+		out.append(self.__FU_HORIZ_LINE + "\n")
 
 	def __reg_dest_table(self, 
-		reg_dest_status, 
-		clock, 
-		index_holder,
-		this_clock_updated_regs,
+		state, 
+		changed_register_ids,
 		colored=True):
 
-		for reg_label in reg_dest_status:
-			if len(reg_dest_status[reg_label]) > 1:
-				print_index = index_holder[reg_label]
+		out = self.__out
+		history = state.history
+
+		if colored:
+			changed_color, unchanged_color = self.__COLORS
+			color_reseter = self.__COLOR_RESETER
+		else:
+			changed_color = unchanged_color = color_reseter = ""
 
-				if colored:
-					color = Fore.GREEN \
-						if reg_label in this_clock_updated_regs\
-						else Fore.RED
-					color_reseter = Style.RESET_ALL
-				else:
-					color = ""
-					color_reseter = ""
+		for register_id, reg_label in enumerate(history.register_labels):
+			if register_id in history.changed_register_ids:
+				color = changed_color \
+					if register_id in changed_register_ids\
+					else unchanged_color
 
-				print(reg_label, ": [", color +\
-					self.__prepare_value(reg_dest_status[reg_label][print_index]) +\
-					color_reseter, "]", end=" ")
+				out.append(reg_label + " : [ " + color +\
+					self.__prepare_value(state.register(register_id)) +\
+					color_reseter + " ] ")
 
-		if self.__omitted_reg_count > 0:
-			print("[...] (More", 
-				self.__omitted_reg_count, 
-				"omitted registers)", 
-				end="")
-		print()
+		out.append(self.__REG_FOOTER)
+
+	def __inst_status_changes(self, inst_events, clock):
+		"""
+			Just the pipeline stages completed by each
+			instruction in the given clock cycle.
+		"""
+		for pc, stage_labels in inst_events.get(clock, ()):
+			self.__out.append(self.__inst_row_labels[pc] + " " +\
+				", ".join(stage_labels) + "\n")
+
+	def __func_unit_changes(self, state, changed_fields):
+		"""
+			Just the functional unit fields changed in the
+			given clock cycle, with their new values.
+		"""
+		replica_keys = state.history.replica_keys
+
+		cur_replica_index = None
+		for replica_index, table_label in sorted(changed_fields,
+			key=lambda item: (item[0], self.__fu_field_order[item[1]])):
+
+			if replica_index != cur_replica_index:
+				if cur_replica_index is not None:
+					self.__out.append("\n")
+				self.__out.append(\
+					self.__fu_row_labels[replica_keys[replica_index]])
+				cur_replica_index = replica_index
+
+			self.__out.append(table_label + "=" + self.__prepare_value(\
+				state.func_unit_field(replica_index, table_label)) + " ")
+
+		if cur_replica_index is not None:
+			self.__out.append("\n")
+
+	def __reg_dest_changes(self, state, changed_register_ids):
+		"""
+			Just the register result status changed in
+			the given clock cycle, with their new values.
+		"""
+		register_labels = state.history.register_labels
+
+		for register_id in sorted(changed_register_ids):
+			self.__out.append(register_labels[register_id] + " : [ " +\
+				self.__prepare_value(state.register(register_id)) + " ] ")
+
+		self.__out.append("\n")
 
 	def __full_output(self,
 		ans, 
@@ -338,74 +374,126 @@ class TextualInterface:
 		decorate="~", 
 		item_symbol="->", 
 		quantity=100,
-		colored=True):
+		colored=True,
+		diff=False,
+		keyframe_interval=100):
 
 		colorama_init()
 
+		# Colors are stripped out anyway if the output is not
+		# a terminal (e.g. a file), so do not even produce them
+		# (colorama would split every write at every color)
+		colored = colored and sys.stdout.isatty()
+
 		# Fancy decoration line for separate interface elements
 		sep_line = decorate * quantity
 
-		# Structure used to orchestrate the print indexes of
-		# functional unit output metadata and functional unit
-		# fields current data index
-		index_holder = { 
-			"fields" : {
-				func_unit : {
-					replica_id : {
-						"field_index" : {
-							field_label : 0
-							for field_label in\
-								ans["func_unit_status"][func_unit][replica_id]
-						},
-						"func_unit_print_index" : 0,
-					} for replica_id in ans["func_unit_status"][func_unit]
-				} for func_unit in ans["func_unit_status"]
-			},
-			"registers" : {
-				reg_id : 0
-				for reg_id in ans["reg_dest_status"]
-			}
-		}
+		history = ans["history"]
+
+		if history is None:
+			raise UserWarning("Can't find the scoreboard history.",
+				"Please enable \"record_history\" in the",
+				"Scoreboard to produce the complete output.")
+
+		# Scoreboard state, moved forward clock by clock
+		# replaying the scoreboard history
+		state = history.state_at(-1)
 
 		prompt_counter = clock_steps
 		state_counter = -1
 
 		FINAL_CLOCK_VAL = ans["update_timers"][-1] + 1
 
-		for clock in sorted(ans["update_timers"] + [FINAL_CLOCK_VAL]):
-			print(sep_line, ("State for clock cycle " + str(clock) +\
-					" of " + str(FINAL_CLOCK_VAL - 1) + " total")\
+		# Titles of the tables of every clock cycle
+		INST_TITLE = "\n " + item_symbol + " Instruction status table:\n"
+		FU_TITLE = "\n " + item_symbol + " Functional Unit status table:\n"
+		REG_TITLE = "\n " + item_symbol + " Destiny Register status table:\n"
+
+		# Same as above, but for the changes-only output
+		INST_DIFF_TITLE = "\n " + item_symbol +\
+			" Instruction status changes:\n"
+		FU_DIFF_TITLE = "\n " + item_symbol +\
+			" Functional Unit status changes:\n"
+		REG_DIFF_TITLE = "\n " + item_symbol +\
+			" Destiny Register status changes:\n"
+
+		# Pipeline stages completed by each instruction (in
+		# PC order) at each clock cycle, for the changes-only
+		# output
+		inst_events = {}
+		if diff:
+			for pc in self.__inst_sorted_pcs:
+				pc_events = {}
+				for print_label in self.__inst_print_order:
+					pc_events.setdefault(ans["inst_status"][pc][print_label],
+						[]).append(print_label)
+
+				for clock in pc_events:
+					inst_events.setdefault(clock, []).append(\
+						(pc, pc_events[clock]))
+
+		for clock in sorted([*ans["update_timers"], FINAL_CLOCK_VAL]):
+			state.advance(clock)
+			changed_fields, changed_register_ids = history.changes_at(clock)
+
+			# In the changes-only output, only the first state,
+			# every "keyframe_interval" states and the final state
+			# are printed with the full tables
+			keyframe = not diff or clock == FINAL_CLOCK_VAL or \
+				(state_counter + 1) % keyframe_interval == 0
+
+			self.__out.append(sep_line + "\n" +\
+				(("State for clock cycle " + str(clock) +\
+					" of " + str(FINAL_CLOCK_VAL - 1) + " total" +\
+					("" if keyframe else " (changes only)"))\
 				if clock != FINAL_CLOCK_VAL \
-				else "Final state", 
-				sep_line, sep="\n")
-			"""
-				Instruction status table
-			"""
-			print("\n", item_symbol, "Instruction status table:")
-			self.__inst_status_table(
-				ans["inst_status"], 
-				clock, 
-				colored and clock != FINAL_CLOCK_VAL)
-
-			"""
-				Functional Unit status table
-			"""
-			print("\n", item_symbol, "Functional Unit status table:")
-			this_clock_updated_regs = self.__func_unit_table(ans["func_unit_status"], 
-				clock, 
-				index_holder["fields"], 
-				index_holder["registers"], 
-				colored and clock != FINAL_CLOCK_VAL)
-
-			"""
-				Destiny Register status table
-			"""
-			print("\n", item_symbol, "Destiny Register status table:")
-			self.__reg_dest_table(ans["reg_dest_status"], 
-				clock, 
-				index_holder["registers"], 
-				this_clock_updated_regs,
-				colored and clock != FINAL_CLOCK_VAL)
+				else "Final state") + "\n" + sep_line + "\n")
+
+			if keyframe:
+				"""
+					Instruction status table
+				"""
+				self.__out.append(INST_TITLE)
+				self.__inst_status_table(
+					ans["inst_status"], 
+					clock, 
+					colored and clock != FINAL_CLOCK_VAL)
+
+				"""
+					Functional Unit status table
+				"""
+				self.__out.append(FU_TITLE)
+				self.__func_unit_table(state, 
+					changed_fields, 
+					colored and clock != FINAL_CLOCK_VAL)
+
+				"""
+					Destiny Register status table
+				"""
+				self.__out.append(REG_TITLE)
+				self.__reg_dest_table(state, 
+					changed_register_ids,
+					colored and clock != FINAL_CLOCK_VAL)
+
+			else:
+				"""
+					Just the changed cells of every table
+				"""
+				if clock in inst_events:
+					self.__out.append(INST_DIFF_TITLE)
+					self.__inst_status_changes(inst_events, clock)
+
+				if changed_fields:
+					self.__out.append(FU_DIFF_TITLE)
+					self.__func_unit_changes(state, changed_fields)
+
+				if changed_register_ids:
+					self.__out.append(REG_DIFF_TITLE)
+					self.__reg_dest_changes(state, changed_register_ids)
+
+			# Just a single write for all tables of the
+			# current clock cycle
+			self.__flush()
 
 			# Interrupt process if user specify a positive
 			# number of clock cycles to be printed each
@@ -418,6 +506,51 @@ class TextualInterface:
 					" (more " + str(len(ans["update_timers"]) -\
 					state_counter) + " states remaining)\n")
 
+	def print_state(self,
+		ans,
+		state,
+		pcs,
+		title,
+		decorate="~",
+		item_symbol="->",
+		quantity=-1,
+		colored=True):
+		"""
+			Print the tables of a single scoreboard state (as
+			returned by "ScoreboardHistory.state_at"), with just
+			the instruction status of the given instructions, so
+			the cost depends only on the scoreboard size, and not
+			on the program size.
+		"""
+		colorama_init()
+		colored = colored and sys.stdout.isatty()
+
+		if quantity <= 0:
+			quantity = len(self.__FU_HORIZ_LINE)
+
+		sep_line = decorate * quantity
+
+		changed_fields, changed_register_ids = \
+			state.history.changes_at(state.clock)
+
+		self.__out.append(sep_line + "\n" + title + "\n" + sep_line + "\n")
+
+		self.__out.append("\n " + item_symbol + " Instruction status table:\n")
+		self.__inst_status_table(ans["inst_status"],
+			state.clock,
+			colored,
+			pcs=pcs)
+
+		self.__out.append("\n " + item_symbol +\
+			" Functional Unit status table:\n")
+		self.__func_unit_table(state, changed_fields, colored)
+
+		self.__out.append("\n " + item_symbol +\
+			" Destiny Register status table:\n")
+		self.__reg_dest_table(state, changed_register_ids, colored)
+
+		self.__flush()
+
 	def print_answer(self, 
 		ans, 
 		clock_steps=-1,
@@ -425,7 +558,9 @@ class TextualInterface:
 		item_symbol="->", 
 		quantity=-1,
 		full=False,
-		colored=True):
+		colored=True,
+		diff=False,
+		keyframe_interval=100):
 
 		if quantity <= 0:
 			quantity = len(self.__FU_HORIZ_LINE)
@@ -437,9 +572,12 @@ class TextualInterface:
 				decorate, 
 				item_symbol, 
 				quantity,
-				colored)
+				colored,
+				diff,
+				keyframe_interval)
 		else:
 			self.__inst_status_table(\
 				ans["inst_status"],
 				max(ans["update_timers"]) + 1,
 				colored=False)
+			self.__flush()
@@ -0,0 +1,141 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	On-disk cache of parsed input files, so the
+	same input file is not parsed again while
+	neither it nor the configuration it was
+	parsed with changes.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+import sys
+sys.path.insert(0, "../")
+from configme import Config
+import hashlib
+import json
+import os
+import pickle
+
+class ParseCache:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Every cache entry is a file in the cache directory
+		named after its key, which is a hash of:
+
+		- The input file contents;
+		- The configuration which affects the parsing
+		  ("Config.instruction_list", "store_instruction_set",
+		  "custom_inst_additional_delay", the functional units
+		  of the architecture and, if the registers are
+		  verified, its register set).
+
+		So entries of outdated input files or configurations
+		are just never looked up again, and are eventually
+		evicted: whenever the cache directory grows beyond
+		"max_size" bytes, the least recently used entries
+		(by file modification time, which is updated on
+		every hit) are removed.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	# Changing the entry format must change every key
+	FORMAT_VERSION = 2
+
+	ENTRY_SUFFIX = ".parsed"
+
+	def __init__(self, cache_dir, max_size=256 * 1024 * 1024):
+		self.cache_dir = cache_dir
+		self.max_size = max_size
+
+		os.makedirs(self.cache_dir, exist_ok=True)
+
+	def key(self, filepath, architecture, verify_reg):
+		"""
+			Cache key of the given input file parsed with the
+			given architecture and current configuration.
+		"""
+		fingerprint = {
+			"format_version" : self.FORMAT_VERSION,
+			"instruction_list" : Config.instruction_list,
+			"store_instruction_set" : sorted(Config.store_instruction_set),
+			"custom_inst_additional_delay" : Config.custom_inst_additional_delay,
+			"functional_units" : sorted(architecture["functional_units"]),
+			"registers" : sorted(architecture["registers"]) \
+				if verify_reg else None,
+		}
+
+		key_hash = hashlib.sha256(json.dumps(fingerprint,
+			sort_keys=True).encode("utf-8"))
+
+		with open(filepath, "rb") as f:
+			for chunk in iter(lambda: f.read(1 << 20), b""):
+				key_hash.update(chunk)
+
+		return key_hash.hexdigest()
+
+	def __entry_path(self, key):
+		return os.path.join(self.cache_dir, key + self.ENTRY_SUFFIX)
+
+	def get(self, key):
+		"""
+			Return the instruction list of the given key, or
+			None if it is not cached.
+		"""
+		entry_path = self.__entry_path(key)
+
+		try:
+			with open(entry_path, "rb") as f:
+				entry = pickle.load(f)
+		except (OSError, EOFError, pickle.UnpicklingError):
+			return None
+
+		# Mark the entry as the most recently used one
+		try:
+			os.utime(entry_path)
+		except OSError:
+			pass
+
+		return entry
+
+	def put(self, key, instruction_list):
+		"""
+			Store the instruction list parsed, evicting older
+			entries if needed.
+		"""
+		entry_path = self.__entry_path(key)
+
+		# Write to a temporary file first, so concurrent
+		# readers never see a partially written entry
+		tmp_path = entry_path + "." + str(os.getpid())
+		with open(tmp_path, "wb") as f:
+			pickle.dump(instruction_list, f,
+				protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_path, entry_path)
+
+		self.evict()
+
+	def evict(self):
+		"""
+			Remove the least recently used entries until the
+			cache directory fits in "max_size" bytes.
+		"""
+		entries = []
+		for entry in os.scandir(self.cache_dir):
+			if entry.name.endswith(self.ENTRY_SUFFIX):
+				try:
+					stat = entry.stat()
+				except OSError:
+					continue
+				entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+		total_size = sum(size for _, size, _ in entries)
+
+		for _, size, entry_path in sorted(entries):
+			if total_size <= self.max_size:
+				break
+
+			try:
+				os.remove(entry_path)
+			except OSError:
+				pass
+
+			total_size -= size
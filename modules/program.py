@@ -0,0 +1,257 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Compiled (pre-decoded) program format, so
+	large assembly input files need to be parsed
+	just once and then can be loaded instantly
+	(memory-mapped) by every simulation.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+import sys
+sys.path.insert(0, "../")
+import json
+import mmap
+import struct
+
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	COMPILED PROGRAM FILE FORMAT:
+
+	MAGIC (8 bytes)
+	Header offset (uint64, little endian)
+	Instruction records (RECORD format), one per
+	instruction, in program order.
+	Header (JSON, UTF-8, up to the end of the file),
+	with the tables below:
+		"opcodes":	instruction label of each opcode id (as
+				{"label" : label}). The remaining metadata
+				(e.g. functional unit and additional cost)
+				is taken from the configuration by the
+				time the program is loaded (see
+				"ReadFile.load_compiled_program").
+		"registers":	register label of each register id.
+		"strings":	non-integer immediate values and jump
+				labels.
+		"inst_num":	number of instructions.
+
+	The header comes last, so programs are compiled
+	without keeping all records in memory.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+MAGIC = b"SBPROG\x00\x01"
+
+HEADER_OFFSET = struct.Struct("<Q")
+
+RECORDS_START = len(MAGIC) + HEADER_OFFSET.size
+
+# Fixed-width instruction record: opcode id, format variant id,
+# operand kind (OPERAND_* constants below), register ids of REG_FIELDS
+# (-1 if absent) and operand value (integer immediate value or
+# id in the "strings" table)
+RECORD = struct.Struct("<HBBiiiiq")
+
+REG_FIELDS = ("reg_dest", "reg_source", "reg_source_j", "reg_source_k")
+
+FORMAT_VARIANTS = (None, "common", "lw_sw", "branch_1", "branch_2")
+
+# Kinds of the operand value of each record
+OPERAND_NONE = 0
+OPERAND_IMMEDIATE_INT = 1
+OPERAND_IMMEDIATE_STR = 2
+OPERAND_JMP_LABEL = 3
+
+# Fields of inst_pack which are stored in the records,
+# and not in the "opcodes" table
+RECORD_FIELDS = {"inst_format_variant", "immediate", "jmp_label", *REG_FIELDS}
+
+def compile_program(instructions, filepath):
+	"""
+		Write the given instruction list (as returned by
+		"ReadFile.load_instructions") to a compiled program
+		file.
+	"""
+	opcodes = []
+	opcode_ids = {}
+	registers = []
+	register_ids = {}
+	strings = []
+	string_ids = {}
+
+	def table_id(table, table_ids, val):
+		if val not in table_ids:
+			table_ids[val] = len(table)
+			table.append(val)
+		return table_ids[val]
+
+	inst_num = 0
+
+	with open(filepath, "wb") as f:
+		f.write(MAGIC)
+		f.write(HEADER_OFFSET.pack(0))
+
+		for inst_pack in instructions:
+			opcode_id = table_id(opcodes, opcode_ids, inst_pack["label"])
+
+			reg_ids = [table_id(registers, register_ids, inst_pack[field])
+				if field in inst_pack else -1
+				for field in REG_FIELDS]
+
+			operand_kind, operand = OPERAND_NONE, 0
+			if "jmp_label" in inst_pack:
+				operand_kind = OPERAND_JMP_LABEL
+				operand = table_id(strings, string_ids, inst_pack["jmp_label"])
+
+			elif "immediate" in inst_pack:
+				immediate = inst_pack["immediate"]
+
+				# Integer immediate values are stored as they are, as
+				# long as they can be read back exactly the same way
+				try:
+					if str(int(immediate)) != immediate or \
+						not -2**63 <= int(immediate) < 2**63:
+						raise ValueError
+					operand_kind, operand = OPERAND_IMMEDIATE_INT, int(immediate)
+				except ValueError:
+					operand_kind = OPERAND_IMMEDIATE_STR
+					operand = table_id(strings, string_ids, immediate)
+
+			f.write(RECORD.pack(opcode_id,
+				FORMAT_VARIANTS.index(inst_pack.get("inst_format_variant")),
+				operand_kind,
+				*reg_ids,
+				operand))
+
+			inst_num += 1
+
+		header_offset = f.tell()
+
+		f.write(json.dumps({
+			"opcodes" : [{"label" : inst_label} for inst_label in opcodes],
+			"registers" : registers,
+			"strings" : strings,
+			"inst_num" : inst_num,
+		}).encode("utf-8"))
+
+		f.seek(len(MAGIC))
+		f.write(HEADER_OFFSET.pack(header_offset))
+
+def is_compiled_program(filepath):
+	"""
+		Check if the given file is a compiled program.
+	"""
+	with open(filepath, "rb") as f:
+		return f.read(len(MAGIC)) == MAGIC
+
+class DecodedRecords(dict):
+	"""
+		Decoded instruction records of a program image, by
+		instruction index. Records are decoded when first
+		accessed, and all of them are dropped whenever
+		"cache_size" records are kept, so only the recently
+		used ones (e.g. the dispatched instruction window)
+		stay decoded, and accessing them is a plain dict
+		lookup.
+	"""
+	def __init__(self, decode, cache_size):
+		self.decode = decode
+		self.cache_size = cache_size
+
+	def __missing__(self, inst_id):
+		if len(self) >= self.cache_size:
+			self.clear()
+
+		inst_pack = self[inst_id] = self.decode(inst_id)
+		return inst_pack
+
+class ProgramImage:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Read-only instruction list backed by a memory-mapped
+		compiled program file. Only the header is read when
+		it is opened: each instruction record is decoded
+		straight from the mapped file when it is accessed
+		(the most recently used ones are kept decoded in
+		"decoded", see "DecodedRecords"), so it can replace
+		the instruction list returned by
+		"ReadFile.load_instructions" anywhere.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	def __init__(self, filepath, decoded_cache_size=4096):
+		with open(filepath, "rb") as f:
+			self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if self.__mmap[:len(MAGIC)] != MAGIC:
+			self.__mmap.close()
+			raise Exception("\"" + filepath + "\" is not a compiled program.")
+
+		header_offset, = HEADER_OFFSET.unpack_from(self.__mmap, len(MAGIC))
+		header = json.loads(self.__mmap[header_offset:].decode("utf-8"))
+
+		self.opcodes = header["opcodes"]
+		self.registers = header["registers"]
+		self.strings = header["strings"]
+		self.inst_num = header["inst_num"]
+
+		self.decoded = DecodedRecords(self.__decode, decoded_cache_size)
+
+	def __decode(self, inst_id):
+		opcode_id, variant_id, operand_kind, *reg_ids, operand = \
+			RECORD.unpack_from(self.__mmap,
+				RECORDS_START + inst_id * RECORD.size)
+
+		inst_pack = {**self.opcodes[opcode_id]}
+
+		if variant_id:
+			inst_pack["inst_format_variant"] = FORMAT_VARIANTS[variant_id]
+
+		for field, reg_id in zip(REG_FIELDS, reg_ids):
+			if reg_id >= 0:
+				inst_pack[field] = self.registers[reg_id]
+
+		if operand_kind == OPERAND_IMMEDIATE_INT:
+			inst_pack["immediate"] = str(operand)
+		elif operand_kind == OPERAND_IMMEDIATE_STR:
+			inst_pack["immediate"] = self.strings[operand]
+		elif operand_kind == OPERAND_JMP_LABEL:
+			inst_pack["jmp_label"] = self.strings[operand]
+
+		return inst_pack
+
+	def __len__(self):
+		return self.inst_num
+
+	def __getitem__(self, inst_id):
+		if not 0 <= inst_id < self.inst_num:
+			raise IndexError("instruction index out of range")
+		return self.decoded[inst_id]
+
+	def __iter__(self):
+		for inst_id in range(self.inst_num):
+			yield self.decoded[inst_id]
+
+	def close(self):
+		self.__mmap.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+if __name__ == "__main__":
+	from modules.readfile import ReadFile
+
+	if len(sys.argv) < 3:
+		print("usage:", sys.argv[0],
+			"<source_code_filepath> <compiled_program_filepath> [--checkreg]")
+		exit(1)
+
+	rf = ReadFile()
+	architecture = rf.load_architecture()
+
+	compile_program(rf.iter_instructions(\
+			sys.argv[1],
+			architecture,
+			verify_reg="--checkreg" in sys.argv),
+		sys.argv[2])
@@ -10,6 +10,8 @@
 import sys
 sys.path.insert(0, "../")
 from configme import Config
+from modules.program import ProgramImage
+from modules.parsecache import ParseCache
 import re
 from collections import OrderedDict
 
@@ -69,7 +71,17 @@ class ReadFile:
 
 		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	"""
-	def __init__(self):
+	# Maximum number of distinct lines whose decoded
+	# instruction is kept while reading an input file
+	DECODED_LINES_CACHE_SIZE = 1 << 16
+
+	def __init__(self, cache_dir=None, cache_max_size=256 * 1024 * 1024):
+		# On-disk cache of parsed input files (check out
+		# "modules/parsecache.py"), if a directory is given
+		self.parse_cache = None
+		if cache_dir is not None:
+			self.parse_cache = ParseCache(cache_dir, cache_max_size)
+
 		# Load regular expressions
 		self.re_match_commentary = re.compile(r"#.*$")
 
@@ -159,10 +171,9 @@ class ReadFile:
 		if not verify:
 			# If "verify" is disabled, then accept
 			# all registers even if it wasn't declared
-			# previsusly in the architecture
-			if register_label not in architecture["registers"]:
-				architecture["registers"].update({register_label})
-
+			# previsusly in the architecture (which is
+			# kept untouched, as it may be shared with
+			# "configme.py" module)
 			return register_label
 
 		"""
@@ -239,6 +250,75 @@ class ReadFile:
 
 	def load_instructions(self, filepath, architecture, verify_reg=True):
 		"""
+			Load the whole instruction list of the given assembly
+			input file. Check out "ReadFile.iter_instructions" for
+			the input file format.
+
+			If a cache directory was given, the instruction list
+			is loaded from the parse cache whenever neither the
+			input file nor the configuration changed since it
+			was last parsed.
+		"""
+		if self.parse_cache is None:
+			return list(self.iter_instructions(filepath, 
+				architecture, 
+				verify_reg=verify_reg))
+
+		cache_key = self.parse_cache.key(filepath, architecture, verify_reg)
+
+		instruction_list = self.parse_cache.get(cache_key)
+
+		if instruction_list is not None:
+			return instruction_list
+
+		instruction_list = list(self.iter_instructions(filepath, 
+			architecture, 
+			verify_reg=verify_reg))
+
+		self.parse_cache.put(cache_key, instruction_list)
+
+		return instruction_list
+
+	def load_compiled_program(self, filepath, architecture, verify_reg=True):
+		"""
+			Memory-map a compiled program (see "modules/program.py"),
+			checking its instructions and registers against the current
+			configuration just like "ReadFile.load_instructions" does,
+			as it can replace the instruction list returned by it.
+		"""
+		program = ProgramImage(filepath)
+
+		# Just the label of each opcode is taken from the compiled
+		# program: its metadata (e.g. functional unit and additional
+		# cost) is checked and taken from the current configuration,
+		# just like "ReadFile.load_instructions" does
+		try:
+			program.opcodes = [self.__base_inst_pack(opcode["label"],
+					architecture,
+					opcode["label"] + " (in compiled program \"" +\
+						filepath + "\")")
+				for opcode in program.opcodes]
+		except:
+			program.close()
+			raise
+
+		for register_label in program.registers:
+			if verify_reg and register_label not in architecture["registers"]:
+				program.close()
+				raise Exception("Unknown register label \"" + register_label +\
+					"\" in compiled program \"" + filepath +\
+					"\".\nIf this is not an error, please declare" +\
+					" it in \"Config.architecture_register_list\""+\
+					" inside \"configme.py\" module.")
+
+		return program
+
+	def iter_instructions(self, filepath, architecture, verify_reg=True):
+		"""
+			Generator of the instructions of the given assembly
+			input file, which is read lazily (one line at a time),
+			so the input file may be arbitrarily large.
+
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			Input file format:
 
@@ -257,9 +337,17 @@ class ReadFile:
 			module!
 		"""
 
+		# Decoder of each instruction label, built just once
+		# (at the first line using the instruction label)
+		decoders = {}
+
+		# Register set of the architecture
+		registers = architecture["registers"]
 
-		# Hold all instructions with some metadata
-		instruction_list = []
+		# Instruction already decoded for each distinct line
+		# (up to "DECODED_LINES_CACHE_SIZE" lines), as loops
+		# and traces repeat the very same lines over and over
+		decoded_lines = {}
 
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -270,12 +358,19 @@ class ReadFile:
 			program_line_counter = -1
 			for instruction_line in f:
 				# Remove commentaries in the assembly line code, if any
-				instruction = self.re_match_commentary.sub("", instruction_line)
+				if "#" in instruction_line:
+					instruction_line = self.re_match_commentary.sub("", instruction_line)
+
+				inst_pack = decoded_lines.get(instruction_line)
+				if inst_pack is not None:
+					program_line_counter += 1
+					yield {**inst_pack}
+					continue
 
 				# Check if there's a instruction label, because the
 				# current code line can be a blank line or just a commentary
 				# line (already removed).
-				inst_label_match = self.re_get_inst_label.match(instruction)
+				inst_label_match = self.re_get_inst_label.match(instruction_line)
 
 				if inst_label_match:
 					program_line_counter += 1
@@ -283,159 +378,198 @@ class ReadFile:
 					# Get instruction label
 					inst_label = inst_label_match.group(1)
 
-					# Check if instruction is declared at Config.instruction_list
-					# within configme.py module
-					if inst_label not in Config.instruction_list:
-						raise Exception("Unknown instruction \"" +\
-							self.__instexception(inst_label, 
-								program_line_counter, 
-								architecture["word_size"]) +\
-								"\"")
-
-					# Create a pack to tie together the current instruction
-					# with some metadata that will be useful during the
-					# scoreboarding process
-					inst_pack = {
-						"label" : inst_label, 
-						**Config.instruction_list[inst_label],
-					}
-
-					# Check if declared instruction type actually is a MIPS
-					# supported instruction type "R", "I" or "J".
-					inst_type = inst_pack["instruction_type"]
-					if inst_type not in {"R", "I", "J"}:
-						raise Exception("Unknown instruction type \"" +\
-							inst_type + "\". Need be in {\"R\", \"I\", \"J\"}" +\
-							" (in " + self.__instexception(inst_label, \
-								program_line_counter, 
-								architecture["word_size"]) + ")")
-					
-					# Parse the instruction using a proper regular expression
-					# based on it's type.
-					for matcher_variant in self.re_list_matchers[inst_type]:
-						match = self.re_list_matchers[inst_type][matcher_variant].match(instruction)
+					decoder = decoders.get(inst_label)
+					if decoder is None:
+						decoder = self.__build_decoder(inst_label, 
+							architecture, 
+							program_line_counter)
+						decoders[inst_label] = decoder
+
+					# Parse the instruction using the instruction formats
+					# of its type, in order, until one of them matches
+					for matcher, base_inst_pack, fields, reg_group_ids in decoder:
+						match = matcher.match(instruction_line)
 
 						if match:
-							"""
-								~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-								Load instruction metadata from configme.py file
-								~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-							"""
-							
-							# Check if given instruction functional unit
-							# actually exists in the given architecture
-							if inst_pack["functional_unit"] not \
-								in architecture["functional_units"]:
-
-								raise Exception("Unknown funcional unit \"" +\
-									inst_pack["functional_unit"] +\
-									"\" of instruction \"" +\
-									self.__instexception(inst_label, 
-										program_line_counter, 
-										architecture["word_size"]))
-
-							# User can configure additional costs for customs
-							# instructions in Config.custom_inst_additional_delay
-							# within configme.py module
-							if inst_label in Config.custom_inst_additional_delay:
-								inst_pack["additional_cost"] = Config.\
-									custom_inst_additional_delay[inst_label]
-
-								# No negative "additional_cost" allowed for 
-								# any instruction
-								if inst_pack["additional_cost"] <= 0:
-									raise Exception("Instruction \"" +\
-										self.__instexception(inst_label, 
-											program_line_counter, 
-											architecture["word_size"]) +\
-										" has non-positive additional cost (" + \
-										str(inst_pack["additional_cost"]) + ")")
-
-							if inst_type == "R":
-								"""
-									~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-									Instruction type R configuration:
-									Inst_label r_dest, r_op_j, r_op_k
-									~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-								"""
-								inst_pack["reg_dest"] = self.__checkreg(match.group(2), 
-									architecture, program_line_counter, verify=verify_reg)
-								inst_pack["reg_source_j"] = self.__checkreg(match.group(3),
-									architecture, program_line_counter, verify=verify_reg)
-								inst_pack["reg_source_k"] = self.__checkreg(match.group(4),
-									architecture, program_line_counter, verify=verify_reg)
-
-							elif inst_type == "I":
-								"""
-									~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-									Instruction type I configuration:
-									Variant 1.a (LW): Inst_label r_dest, imm(r_op)
-									Variant 1.b (SW): Inst_label r_op_k, imm(r_op_j)
-									Variant 2 (Cond. Branch 1): Inst_label r_op, target_label
-									Variant 3 (Cond. Branch 2): Inst_label r_op_j, r_op_k, target_label
-									Variant 4 (Common): Inst_label r_dest, r_op, immediate_val
-									~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-								"""
-								inst_pack["inst_format_variant"] = matcher_variant
-								if matcher_variant == "lw_sw":
-									# MIPS is a LOAD/STORE architecture, which means
-									# that the only type of instructions that can access
-									# the primary memory (probably a RAM variant) are "lw"
-									# and "sw" instructions.
-									if inst_pack["label"] in Config.store_instruction_set:
-										# Store Word operations (does not have a destiny register)
-										inst_pack["reg_source_k"] = self.__checkreg(match.group(2),
-											architecture, program_line_counter, verify=verify_reg)
-										inst_pack["immediate"] = match.group(3)
-										inst_pack["reg_source_j"] = self.__checkreg(match.group(4), 
-											architecture, program_line_counter, verify=verify_reg)
-										
-									else:
-										# Load Word operations
-										inst_pack["reg_dest"] = self.__checkreg(match.group(2),
-											architecture, program_line_counter, verify=verify_reg)
-										inst_pack["immediate"] = match.group(3)
-										inst_pack["reg_source"] = self.__checkreg(match.group(4), 
-											architecture, program_line_counter, verify=verify_reg)
-
-								elif matcher_variant == "common":
-									inst_pack["reg_dest"] = self.__checkreg(match.group(2),
-										architecture, program_line_counter, verify=verify_reg)
-									inst_pack["reg_source"] = self.__checkreg(match.group(3), 
-										architecture, program_line_counter, verify=verify_reg)
-									inst_pack["immediate"] = match.group(4)
-
-								elif matcher_variant == "branch_1":
-									inst_pack["reg_source"] = self.__checkreg(match.group(2),
-										architecture, program_line_counter, verify=verify_reg)
-									inst_pack["immediate"] = match.group(3)
-
-								else:
-									# matcher_variant == "branch_2"
-									inst_pack["reg_source_j"] = self.__checkreg(match.group(2),
-										architecture, program_line_counter, verify=verify_reg)
-									inst_pack["reg_source_k"] = self.__checkreg(match.group(3),
-										architecture, program_line_counter, verify=verify_reg)
-									inst_pack["immediate"] = match.group(4)
-
-							else:
-								"""
-									~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-									Instruction type J configuration:
-									Inst_label jump_label
-									~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-								"""
-								inst_pack["jmp_label"] = match.group(2)
-
-							# Append instruction with its metadata in the
-							# instruction list
-							instruction_list.append(inst_pack)
+							groups = match.groups()
+
+							if verify_reg:
+								for group_id in reg_group_ids:
+									if groups[group_id] not in registers:
+										self.__checkreg(groups[group_id], 
+											architecture, 
+											program_line_counter)
+
+							# Create a pack to tie together the current instruction
+							# with some metadata that will be useful during the
+							# scoreboarding process (the metadata comes last, so
+							# the instruction label is always kept)
+							inst_pack = {**dict(zip(fields, groups)), **base_inst_pack}
+
+							if len(decoded_lines) < self.DECODED_LINES_CACHE_SIZE:
+								decoded_lines[instruction_line] = inst_pack
+
+							# Hand the instruction with its metadata over
+							# to the caller (a copy of it, as the cached one
+							# must be kept intact)
+							yield {**inst_pack}
 
 							# No need to match this instruction with other
 							# instruction format
 							break
+
+	def __base_inst_pack(self, inst_label, architecture, inst_description):
+		"""
+			Check the configuration of the given instruction label
+			and return its metadata (from "configme.py" module),
+			which does not depend on the input line. The given
+			description locates the instruction in error messages.
+		"""
+		# Check if instruction is declared at Config.instruction_list
+		# within configme.py module
+		if inst_label not in Config.instruction_list:
+			raise Exception("Unknown instruction \"" +\
+				inst_description + "\"")
+
+		base_inst_pack = {
+			"label" : inst_label, 
+			**Config.instruction_list[inst_label],
+		}
+
+		# Check if declared instruction type actually is a MIPS
+		# supported instruction type "R", "I" or "J".
+		inst_type = base_inst_pack["instruction_type"]
+		if inst_type not in {"R", "I", "J"}:
+			raise Exception("Unknown instruction type \"" +\
+				inst_type + "\". Need be in {\"R\", \"I\", \"J\"}" +\
+				" (in " + inst_description + ")")
+
+		"""
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+			Load instruction metadata from configme.py file
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		"""
 		
-		return instruction_list
+		# Check if given instruction functional unit
+		# actually exists in the given architecture
+		if base_inst_pack["functional_unit"] not \
+			in architecture["functional_units"]:
+
+			raise Exception("Unknown funcional unit \"" +\
+				base_inst_pack["functional_unit"] +\
+				"\" of instruction \"" +\
+				inst_description)
+
+		# User can configure additional costs for customs
+		# instructions in Config.custom_inst_additional_delay
+		# within configme.py module
+		if inst_label in Config.custom_inst_additional_delay:
+			base_inst_pack["additional_cost"] = Config.\
+				custom_inst_additional_delay[inst_label]
+
+			# No negative "additional_cost" allowed for 
+			# any instruction
+			if base_inst_pack["additional_cost"] <= 0:
+				raise Exception("Instruction \"" +\
+					inst_description +\
+					" has non-positive additional cost (" + \
+					str(base_inst_pack["additional_cost"]) + ")")
+
+		return base_inst_pack
+
+	def __build_decoder(self, inst_label, architecture, program_line_counter):
+		"""
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+			Check the configuration of the given instruction
+			label and resolve everything about it which does
+			not depend on the input line, so each line just
+			needs to be matched and have its fields filled.
+
+			Return the list of instruction formats which the
+			instruction must be tried against, in order, as
+			(matcher, base_inst_pack, fields, reg_group_ids)
+			tuples, where "base_inst_pack" holds the instruction
+			metadata, "fields" are the inst_pack fields of each
+			matcher group (the first one always matches the
+			instruction label) and "reg_group_ids" are the
+			indexes of the groups holding registers.
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		"""
+		base_inst_pack = self.__base_inst_pack(inst_label,
+			architecture,
+			self.__instexception(inst_label,
+				program_line_counter,
+				architecture["word_size"]))
+
+		inst_type = base_inst_pack["instruction_type"]
+
+		decoder = []
+
+		for matcher_variant in self.re_list_matchers[inst_type]:
+			matcher = self.re_list_matchers[inst_type][matcher_variant]
+			variant_inst_pack = {**base_inst_pack}
+
+			if inst_type == "R":
+				"""
+					~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+					Instruction type R configuration:
+					Inst_label r_dest, r_op_j, r_op_k
+					~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+				"""
+				fields = ["label", "reg_dest", "reg_source_j", "reg_source_k"]
+
+			elif inst_type == "I":
+				"""
+					~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+					Instruction type I configuration:
+					Variant 1.a (LW): Inst_label r_dest, imm(r_op)
+					Variant 1.b (SW): Inst_label r_op_k, imm(r_op_j)
+					Variant 2 (Cond. Branch 1): Inst_label r_op, target_label
+					Variant 3 (Cond. Branch 2): Inst_label r_op_j, r_op_k, target_label
+					Variant 4 (Common): Inst_label r_dest, r_op, immediate_val
+					~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+				"""
+				variant_inst_pack["inst_format_variant"] = matcher_variant
+				if matcher_variant == "lw_sw":
+					# MIPS is a LOAD/STORE architecture, which means
+					# that the only type of instructions that can access
+					# the primary memory (probably a RAM variant) are "lw"
+					# and "sw" instructions.
+					if inst_label in Config.store_instruction_set:
+						# Store Word operations (does not have a destiny register)
+						fields = ["label", "reg_source_k", "immediate", "reg_source_j"]
+					else:
+						# Load Word operations
+						fields = ["label", "reg_dest", "immediate", "reg_source"]
+
+				elif matcher_variant == "common":
+					fields = ["label", "reg_dest", "reg_source", "immediate"]
+
+				elif matcher_variant == "branch_1":
+					fields = ["label", "reg_source", "immediate"]
+
+				else:
+					# matcher_variant == "branch_2"
+					fields = ["label", "reg_source_j", "reg_source_k", "immediate"]
+
+			else:
+				"""
+					~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+					Instruction type J configuration:
+					Inst_label jump_label
+					~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+				"""
+				fields = ["label", "jmp_label"]
+
+			# Groups holding registers, in the same order which
+			# they were checked previously
+			reg_group_ids = [group_id 
+				for group_id, field in enumerate(fields)
+				if field.startswith("reg_")]
+
+			decoder.append((matcher, variant_inst_pack, fields, reg_group_ids))
+
+		return decoder
 
 if __name__ == "__main__":
 	import sys
@@ -0,0 +1,152 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Memoization of simulation results, so the
+	same program is not simulated again against
+	architectures which differ only in aspects
+	the program does not depend on (e.g. the
+	delay of a functional unit it never uses).
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+import hashlib
+import json
+
+class ResultCache:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Results are keyed by a hash of:
+
+		- The canonical form of the program: just the instruction
+		  fields the simulation depends on, with registers and
+		  functional units renamed by order of first use, so the
+		  labels themselves do not matter;
+		- The "quantity" and "clock_cycles" of the functional
+		  units used by the program (in the same order), the
+		  pipeline stages, their delays and the word size.
+
+		Only the instruction status table and the update timers
+		are stored, so a cache hit returns an answer (just like
+		the one of "Scoreboard.run") with those and without the
+		functional unit, register and history information, which
+		are None. Such answers have "cached" set to True.
+
+		So scoreboards recording their history (which must be
+		part of their answers) never use the cache at all.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	REG_FIELDS = ("reg_dest", "reg_source", "reg_source_j", "reg_source_k")
+
+	def __init__(self):
+		# Stored (inst_status, update_timers) of each key
+		self.results = {}
+
+		self.hits = 0
+		self.misses = 0
+
+	def fingerprint(self, instructions):
+		"""
+			Canonical program hash of the given instruction list,
+			alongside the functional units it uses (by order of
+			first use). It is computed again on every call, as the
+			program may change in between: callers keying the same
+			unchanged program many times (e.g. the design-space
+			sweep) may compute it once and give it to
+			"ResultCache.key".
+		"""
+		reg_ids = {}
+		func_unit_ids = {}
+
+		canonical_program = []
+
+		for inst_pack in instructions:
+			func_unit = inst_pack["functional_unit"]
+			if func_unit not in func_unit_ids:
+				func_unit_ids[func_unit] = len(func_unit_ids)
+
+			canonical_inst = [func_unit_ids[func_unit],
+				inst_pack["instruction_type"],
+				inst_pack.get("additional_cost", 0)]
+
+			for field in self.REG_FIELDS:
+				if field in inst_pack:
+					reg_ids.setdefault(inst_pack[field], len(reg_ids))
+					canonical_inst.append(reg_ids[inst_pack[field]])
+				else:
+					canonical_inst.append(None)
+
+			canonical_program.append(canonical_inst)
+
+		program_hash = hashlib.sha256(json.dumps(canonical_program,
+			separators=(",", ":")).encode("utf-8")).hexdigest()
+
+		return program_hash, list(func_unit_ids)
+
+	def key(self, instructions, architecture, pipeline_stages, fingerprint=None):
+		"""
+			Result key of the given program simulated against
+			the given architecture (as returned by
+			"ReadFile.load_architecture") with the given
+			pipeline stages. The program fingerprint (see
+			"ResultCache.fingerprint") may be given, if known.
+		"""
+		if fingerprint is None:
+			fingerprint = self.fingerprint(instructions)
+
+		program_hash, func_units = fingerprint
+
+		return hashlib.sha256(json.dumps([
+			program_hash,
+			[[architecture["functional_units"][func_unit]["quantity"],
+				architecture["functional_units"][func_unit]["clock_cycles"]]
+				for func_unit in func_units],
+			[[stage_label, architecture["stage_delay"].get(stage_label)]
+				for stage_label in pipeline_stages],
+			architecture["word_size"],
+		]).encode("utf-8")).hexdigest()
+
+	def run(self, scoreboard, instructions):
+		"""
+			Run the given instruction list in the given
+			scoreboard (which must have its architecture
+			already loaded), unless the result is cached.
+		"""
+		if scoreboard.record_history:
+			scoreboard.reset()
+			scoreboard.load_instructions(instructions)
+			return scoreboard.run()
+
+		key = self.key(instructions, {
+				"functional_units" : scoreboard.functional_units,
+				"stage_delay" : scoreboard.stage_delay,
+				"word_size" : scoreboard.WORD_SIZE,
+			},
+			scoreboard.PIPELINE_STAGES)
+
+		if key in self.results:
+			self.hits += 1
+
+			inst_status, update_timers = self.results[key]
+
+			return {
+				"pipeline_stages" : scoreboard.PIPELINE_STAGES,
+				"inst_status" : {inst_pc : {**inst_status[inst_pc]}
+					for inst_pc in inst_status},
+				"func_unit_status" : None,
+				"reg_dest_status" : None,
+				"update_timers" : list(update_timers),
+				"history" : None,
+				"cached" : True,
+			}
+
+		self.misses += 1
+
+		scoreboard.reset()
+		scoreboard.load_instructions(instructions)
+		ans = scoreboard.run()
+
+		self.results[key] = ({inst_pc : {**ans["inst_status"][inst_pc]}
+				for inst_pc in ans["inst_status"]},
+			list(ans["update_timers"]))
+
+		return ans
@@ -0,0 +1,387 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Binary result file format, so simulation
+	results (instruction status table and the
+	whole change log) can be archived and then
+	loaded instantly (memory-mapped), with random
+	access to any instruction or clock cycle,
+	instead of simulating them again.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+import sys
+sys.path.insert(0, "../")
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from modules.history import ScoreboardHistory
+
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	RESULT FILE FORMAT:
+
+	MAGIC (8 bytes)
+	Header offset (uint64, little endian)
+	Columns, one after another (8-byte aligned), each
+	one an array of fixed-width little endian integers:
+		"stage:<label>" (int64):	clock cycle of the
+			pipeline stage of every instruction, in
+			program order (-1 if not reached).
+		"update_timers" (int64):	update timers.
+		"cycle_row" (int64):		first change log row
+			of each update timer clock cycle (the cycle
+			offset index).
+		"clock", "replica", "field", "value" (int64,
+			int32, int32, int64):	change log columns
+			(see "ScoreboardHistory").
+		"snapshot_clock", "snapshot_row" (int64) and
+		"snapshot_state" (int64, "state_len" values per
+			snapshot):	change log snapshots.
+	Header (JSON, UTF-8, up to the end of the file),
+	with the tables below:
+		"columns":	(offset, typecode, length) of each
+				column.
+		"pipeline_stages", "word_size", "inst_num".
+		"func_unit_status", "reg_dest_status":	final
+				status, just like in "Scoreboard.run".
+		"history":	replica keys, register labels,
+				changed register ids, untouched register
+				count, snapshot interval and "state_len"
+				of the change log (null without it).
+
+	Just like compiled programs, the header comes
+	last, so results are written column by column.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+MAGIC = b"SBRSLT\x00\x01"
+
+HEADER_OFFSET = struct.Struct("<Q")
+
+# Typecode of the change log columns
+HISTORY_COLUMNS = (("clock", "q"), ("replica", "i"),
+	("field", "i"), ("value", "q"))
+
+def save_result(ans, filepath, word_size):
+	"""
+		Write the given answer (as returned by "Scoreboard.run")
+		of a program with the given instruction size to a result
+		file.
+	"""
+	inst_status = ans["inst_status"]
+	inst_pcs = range(0, word_size * len(inst_status), word_size)
+
+	if any(inst_pc not in inst_status for inst_pc in inst_pcs):
+		raise Exception("Only answers with the whole instruction",
+			"status table can be saved (e.g. not streamed ones).")
+
+	history = ans["history"]
+
+	columns = {}
+
+	with open(filepath, "wb") as f:
+		f.write(MAGIC)
+		f.write(HEADER_OFFSET.pack(0))
+
+		def write_column(column_label, typecode, values):
+			column = array(typecode, values)
+			if sys.byteorder != "little":
+				column.byteswap()
+
+			# Columns are aligned, so they can be cast in place
+			f.write(b"\x00" * (-f.tell() % 8))
+
+			columns[column_label] = (f.tell(), typecode, len(column))
+			column.tofile(f)
+
+		for stage_label in ans["pipeline_stages"]:
+			write_column("stage:" + stage_label, "q",
+				(inst_status[inst_pc][stage_label]
+					if inst_status[inst_pc][stage_label] is not None
+					else -1
+					for inst_pc in inst_pcs))
+
+		write_column("update_timers", "q", ans["update_timers"])
+
+		history_header = None
+		if history is not None:
+			write_column("cycle_row", "q",
+				(bisect_left(history.clock, clock)
+					for clock in ans["update_timers"]))
+
+			for column_label, typecode in HISTORY_COLUMNS:
+				write_column(column_label, typecode,
+					getattr(history, column_label))
+
+			# Snapshots taken before some registers were
+			# changed for the first time are shorter: complete
+			# them, so all of them have the same length
+			state_len = len(history.FIELDS) * len(history.replica_keys) +\
+				len(history.register_labels)
+
+			write_column("snapshot_clock", "q", history.snapshot_clocks)
+			write_column("snapshot_row", "q", history.snapshot_rows)
+			write_column("snapshot_state", "q",
+				(state[i] if i < len(state) else -1
+					for state in history.snapshot_states
+					for i in range(state_len)))
+
+			history_header = {
+				"replica_keys" : history.replica_keys,
+				"register_labels" : history.register_labels,
+				"changed_register_ids" : sorted(history.changed_register_ids),
+				"untouched_register_count" : history.untouched_register_count,
+				"snapshot_interval" : history.snapshot_interval,
+				"state_len" : state_len,
+			}
+
+		header_offset = f.tell()
+
+		f.write(json.dumps({
+			"columns" : columns,
+			"pipeline_stages" : ans["pipeline_stages"],
+			"word_size" : word_size,
+			"inst_num" : len(inst_pcs),
+			"func_unit_status" : [[func_unit, replica_id,
+					ans["func_unit_status"][func_unit][replica_id]]
+				for func_unit in ans["func_unit_status"]
+				for replica_id in ans["func_unit_status"][func_unit]]
+				if ans["func_unit_status"] is not None else None,
+			"reg_dest_status" : list(ans["reg_dest_status"].items())
+				if ans["reg_dest_status"] is not None else None,
+			"history" : history_header,
+		}).encode("utf-8"))
+
+		f.seek(len(MAGIC))
+		f.write(HEADER_OFFSET.pack(header_offset))
+
+def is_result_file(filepath):
+	"""
+		Check if the given file is a result file.
+	"""
+	with open(filepath, "rb") as f:
+		return f.read(len(MAGIC)) == MAGIC
+
+def _public_producer(val):
+	# (functional unit label, replica id) pairs are
+	# stored as JSON lists
+	return tuple(val) if type(val) is list else val
+
+class StoredInstStatus(Mapping):
+	"""
+		Read-only instruction status table (by PC) of a
+		result file, whose rows are read from the stage
+		columns just when accessed.
+	"""
+	def __init__(self, stage_columns, word_size, inst_num):
+		self.stage_columns = stage_columns
+		self.word_size = word_size
+		self.inst_num = inst_num
+
+	def __getitem__(self, inst_pc):
+		inst_id, remainder = divmod(inst_pc, self.word_size)
+
+		if remainder or not 0 <= inst_id < self.inst_num:
+			raise KeyError(inst_pc)
+
+		inst_status = {}
+		for stage_label, column in self.stage_columns:
+			stage_clock = column[inst_id]
+			inst_status[stage_label] = stage_clock if stage_clock >= 0 else None
+
+		return inst_status
+
+	def __iter__(self):
+		return iter(range(0, self.word_size * self.inst_num, self.word_size))
+
+	def __len__(self):
+		return self.inst_num
+
+class ResultFile:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Read-only result backed by a memory-mapped result file.
+		Only the header is read when it is opened: every column
+		is used straight from the mapped file, so opening it
+		takes the same time whatever the simulation size, and
+		"ResultFile.answer" is just like the answer returned by
+		"Scoreboard.run" (with the change log in its history),
+		but for the instruction status table and the update
+		timers, which are read-only.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	def __init__(self, filepath):
+		with open(filepath, "rb") as f:
+			self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if self.__mmap[:len(MAGIC)] != MAGIC:
+			self.__mmap.close()
+			raise Exception("\"" + filepath + "\" is not a result file.")
+
+		header_offset, = HEADER_OFFSET.unpack_from(self.__mmap, len(MAGIC))
+		self.header = json.loads(self.__mmap[header_offset:].decode("utf-8"))
+
+		self.pipeline_stages = self.header["pipeline_stages"]
+		self.word_size = self.header["word_size"]
+		self.inst_num = self.header["inst_num"]
+
+		self.__views = []
+
+	def column(self, column_label):
+		"""
+			Read-only sequence of integers of the given column.
+		"""
+		offset, typecode, length = self.header["columns"][column_label]
+		size = length * array(typecode).itemsize
+
+		if sys.byteorder != "little":
+			column = array(typecode, self.__mmap[offset:offset + size])
+			column.byteswap()
+			return column
+
+		view = memoryview(self.__mmap)[offset:offset + size].cast(typecode)
+		self.__views.append(view)
+		return view
+
+	def answer(self):
+		"""
+			Stored answer, in the format of "Scoreboard.run".
+		"""
+		history = None
+		if self.header["history"] is not None:
+			history = self.__history()
+
+		return {
+			"pipeline_stages" : self.pipeline_stages,
+			"inst_status" : StoredInstStatus(
+				[(stage_label, self.column("stage:" + stage_label))
+					for stage_label in self.pipeline_stages],
+				self.word_size,
+				self.inst_num),
+			"func_unit_status" : self.__func_unit_status(),
+			"reg_dest_status" : self.__reg_dest_status(),
+			"update_timers" : self.column("update_timers"),
+			"history" : history,
+		}
+
+	def __reg_dest_status(self):
+		if self.header["reg_dest_status"] is None:
+			return None
+
+		return {
+			register_label : _public_producer(reg_res)
+			for register_label, reg_res in self.header["reg_dest_status"]
+		}
+
+	def __func_unit_status(self):
+		if self.header["func_unit_status"] is None:
+			return None
+
+		func_unit_status = {}
+
+		for func_unit, replica_id, fields in self.header["func_unit_status"]:
+			func_unit_status.setdefault(func_unit, {})[replica_id] = {
+				field : _public_producer(fields[field])
+				for field in fields
+			}
+
+		return func_unit_status
+
+	def __history(self):
+		history_header = self.header["history"]
+
+		history = ScoreboardHistory(\
+			[tuple(replica_key)
+				for replica_key in history_header["replica_keys"]],
+			history_header["register_labels"],
+			history_header["snapshot_interval"])
+
+		state_len = history_header["state_len"]
+		snapshot_state = self.column("snapshot_state")
+
+		snapshot_states = [snapshot_state[i:i + state_len]
+			for i in range(0, len(snapshot_state), state_len)]
+		self.__views += snapshot_states
+
+		history.attach({
+				column_label : self.column(column_label)
+				for column_label, _ in HISTORY_COLUMNS
+			},
+			self.column("snapshot_clock"),
+			self.column("snapshot_row"),
+			snapshot_states,
+			set(history_header["changed_register_ids"]),
+			history_header["untouched_register_count"])
+
+		return history
+
+	def cycle_rows(self, update_timer_id):
+		"""
+			Range of the change log rows of the given update
+			timer (i.e. of the clock cycle "update_timers[id]").
+		"""
+		cycle_row = self.column("cycle_row")
+
+		end = cycle_row[update_timer_id + 1] \
+			if update_timer_id + 1 < len(cycle_row) \
+			else self.header["columns"]["clock"][2]
+
+		return range(cycle_row[update_timer_id], end)
+
+	def close(self):
+		"""
+			Close the result file. Answers taken from it
+			can not be used anymore.
+		"""
+		for view in reversed(self.__views):
+			if isinstance(view, memoryview):
+				view.release()
+		self.__views.clear()
+		self.__mmap.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+if __name__ == "__main__":
+	if len(sys.argv) < 2:
+		print("usage:", sys.argv[0],
+			"<result_filepath> [--pc pc] [--cycle clock]")
+		exit(1)
+
+	with ResultFile(sys.argv[1]) as result:
+		ans = result.answer()
+
+		print("Instructions:", result.inst_num,
+			"Total clock cycles:", ans["update_timers"][-1])
+
+		if "--pc" in sys.argv:
+			inst_pc = int(sys.argv[1 + sys.argv.index("--pc")])
+			print(inst_pc, *[ans["inst_status"][inst_pc][stage_label]
+				for stage_label in result.pipeline_stages], sep="\t")
+
+		if "--cycle" in sys.argv:
+			history = ans["history"]
+			if history is None:
+				print("No change log stored.")
+				exit(2)
+
+			clock = int(sys.argv[1 + sys.argv.index("--cycle")])
+			for row in history.rows_at(clock):
+				field_id = history.field[row]
+
+				if field_id < len(history.FIELDS):
+					field = history.FIELDS[field_id]
+					print(*history.replica_keys[history.replica[row]],
+						field,
+						history.decode(field, history.value[row]),
+						sep="\t")
+				else:
+					print(history.register_labels[field_id - len(history.FIELDS)],
+						history.decode(None, history.value[row]),
+						sep="\t")
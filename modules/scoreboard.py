@@ -1,3 +1,90 @@
+import heapq
+from modules.history import ScoreboardHistory
+from modules.program import ProgramImage
+
+class InstructionStatus(dict):
+	"""
+		Instruction status table: clock cycle in which each
+		instruction (identified by its PC) finished each
+		pipeline stage. Rows are created only when first
+		accessed, i.e. when the instruction enters the
+		dispatched instruction window, so loading even huge
+		programs takes no time.
+	"""
+	def __init__(self, pipeline_stages):
+		self.pipeline_stages = pipeline_stages
+
+	def __missing__(self, inst_pc):
+		inst_status = self[inst_pc] = dict.fromkeys(self.pipeline_stages)
+		return inst_status
+
+class FuncUnitReplica:
+	"""
+		Current status of a single functional unit replica.
+
+		Registers are kept interned as integer ids (see
+		"Scoreboard.register_label") and "q_j"/"q_k" keep a
+		reference to the producer replica itself, so no field
+		access needs any hashing.
+	"""
+	__slots__ = (
+		"func_unit", "replica_id", "index", "key",
+		"busy", "op", "f_i", "f_j", "f_k",
+		"q_j", "q_k", "r_j", "r_k", "waiters",
+		"staged_fields", "staged_registers", "dirty",
+	)
+
+	def __init__(self, func_unit, replica_id, index):
+		self.func_unit = func_unit
+		self.replica_id = replica_id
+
+		# Position of this replica among all replicas of
+		# the architecture
+		self.index = index
+
+		# Functional unit label and replica id pair, as
+		# used in the public "q_j", "q_k" and register
+		# result status values
+		self.key = (func_unit, replica_id)
+
+		# Changes staged in the current clock cycle (see
+		# "Scoreboard.__stage_changes"): new field values and
+		# new register result status (by register id). Both
+		# are reused, so staging allocates nothing.
+		self.staged_fields = {}
+		self.staged_registers = {}
+
+		# Whether any change is staged (i.e. this replica is
+		# in the scoreboard dirty replica list)
+		self.dirty = False
+
+		self.reset()
+
+	def reset(self):
+		"""
+			Set all fields back to the idle replica state.
+		"""
+		self.busy = False
+		self.op = None
+		self.f_i = None
+		self.f_j = None
+		self.f_k = None
+		self.q_j = None
+		self.q_k = None
+		self.r_j = True
+		self.r_k = True
+
+		# Reverse index to the replicas waiting for the
+		# destiny register of this replica, alongside the
+		# ready flags ("r_j" and/or "r_k") it must set, i.e.
+		# every replica whose current "q_j" or "q_k" points
+		# to this replica
+		self.waiters = {}
+
+		self.staged_fields.clear()
+		self.staged_registers.clear()
+		self.dirty = False
+
 class Scoreboard:
 	"""
 		Instruction Status:
@@ -32,14 +119,22 @@ class Scoreboard:
 		Register Result Status:
 		Indicates which functional unit will write in which 
 		destiny register, if any.
+
+		While running, only the current state of each functional
+		unit replica is kept (as "FuncUnitReplica" records) alongside
+		a columnar log of every committed change (see "modules/
+		history.py"). The public answer dictionary holds the final
+		functional unit and register result status, and the change
+		log under the "history" key (None if history recording is
+		disabled).
 	"""
-	def __init__(self, update_flags_stage=True):
-		self.func_unit_status = None
-		self.reg_res_status = None
-		self.inst_status = None
-		self.WORD_SIZE = 0
-		self.PROGRAM_SIZE = 0
-		self.PIPELINE_STAGES = [
+	@staticmethod
+	def pipeline_stages(update_flags_stage=True):
+		"""
+			Pipeline stages of a scoreboard (in order), without
+			building one.
+		"""
+		pipeline_stages = [
 			"issue", 
 			"read_operands", 
 			"execution", 
@@ -52,45 +147,144 @@ class Scoreboard:
 		# with RAW dependency (first instruction write and
 		# second instruction read a same register)
 		if update_flags_stage:
-			self.PIPELINE_STAGES.append("update_flags")
+			pipeline_stages.append("update_flags")
+
+		return pipeline_stages
+
+	def __init__(self, 
+		update_flags_stage=True, 
+		skip_idle_clocks=True, 
+		record_history=True,
+		extrapolate_loops=True,
+		verify_extrapolation=False,
+		numpy_backend=False,
+		change_sink=None):
+		self.replicas = None
+		self.inst_status = None
+		self.WORD_SIZE = 0
+		self.PROGRAM_SIZE = 0
+
+		# Instruction stream source and retired instruction
+		# sink (see "Scoreboard.load_instruction_stream")
+		self.__inst_source = None
+		self.__inst_sink = None
+		self.__streaming = False
+		self.__program = None
+		self.PIPELINE_STAGES = Scoreboard.pipeline_stages(update_flags_stage)
+
+		# Successor of each pipeline stage (None for the last one)
+		self.NEXT_STAGE = dict(zip(self.PIPELINE_STAGES,
+			self.PIPELINE_STAGES[1:] + [None]))
 
 		self.global_clock_timer = 0
 		self.update_timers = []
+
+		# If disabled, keep only the current value of each
+		# functional unit field and register result status
+		# (i.e. the final state, by the end of the simulation)
+		# instead of every change along all clock cycles
+		self.record_history = record_history
+
+		# Fields of every functional unit replica, in the order
+		# they appear in the public answer
+		self.FUNC_UNIT_FIELDS = ScoreboardHistory.FIELDS
+
+		# Functional unit fields which define whether it is
+		# still waiting to read some operand register
+		self.READER_FIELDS = frozenset({"f_j", "f_k", "r_j", "r_k"})
+
+		# Functional unit fields which hold register ids and
+		# producer replicas, respectively
+		self.REGISTER_FIELDS = frozenset({"f_i", "f_j", "f_k"})
+		self.PRODUCER_FIELDS = frozenset({"q_j", "q_k"})
+
+		# Event-driven mode: whenever a whole clock cycle passes
+		# without any instruction changing its pipeline stage, jump
+		# straight to the next clock cycle in which some in-flight
+		# instruction stage cost is satisfied, instead of polling
+		# every idle clock cycle in between
+		self.skip_idle_clocks = skip_idle_clocks
+
+		# Steady-state mode: whenever the scoreboard state becomes
+		# periodic (i.e. the same state, relative to the oldest
+		# active instruction and to the current clock cycle, recurs
+		# some instructions and clock cycles later) over a repeated
+		# instruction block, the remaining iterations are extrapolated
+		# instead of simulated (see "Scoreboard.__extrapolate_loop").
+		# Only available while history recording is disabled, without
+		# a change sink and not in streaming mode. If
+		# "verify_extrapolation" is set, every extrapolated simulation
+		# runs again without extrapolation, and both answers must match.
+		self.extrapolate_loops = extrapolate_loops
+		self.verify_extrapolation = verify_extrapolation
+
+		# Instruction fields which define the instruction timing
+		# (i.e. which repeated instruction blocks must match)
+		self.TIMING_FIELDS = ("functional_unit", "instruction_type",
+			"additional_cost", "reg_dest", "reg_source",
+			"reg_source_j", "reg_source_k")
+
+		# Maximum number of scoreboard states kept while looking
+		# for a periodic one (older states are dropped)
+		self.STEADY_STATE_MAX_SAMPLES = 1 << 13
+
+		# NumPy backend: the readiness of all in-flight instructions
+		# is evaluated at once every clock cycle (see "modules/
+		# vectorized.py"), which pays off for wide architectures
+		# with hundreds of instructions in flight
+		self.numpy_backend = numpy_backend
+		self.__ready_window = None
+
+		# Change sink, notified of every change as soon as it
+		# is committed (e.g. "modules.export.TraceExporter"): it
+		# must provide the methods stage(clock, pc, stage_label),
+		# field(clock, replica_key, field, value) and register(clock,
+		# register_label, value), with values in the public format.
+		# Just like the history, it needs every clock cycle to be
+		# simulated, so it disables the steady-state mode.
+		self.change_sink = change_sink
 		
-		# Auxiliar structure to accumulate all changes in the 
-		# current clock cycle in order to prevent interferences 
-		# from changes of each instruction to the next instruc-
-		# tions within the same clock cycle
-		self.__to_commit_this_clock = {}
+		# Replicas with changes staged in the current clock cycle
+		# (in the order they were first staged), which are held
+		# back until the end of the clock cycle in order to prevent
+		# interferences from changes of each instruction to the
+		# next instructions within the same clock cycle. The
+		# changes themselves are staged in each replica (see
+		# "FuncUnitReplica.staged_fields"), and this list is
+		# reused every clock cycle.
+		self.__dirty_replicas = []
+
+		# The same as above, but for the functional unit waiters
+		# reverse index, in the (producer, consumer, ready_flag,
+		# is_waiting) format
+		self.__waiters_to_commit = []
+
+		# Columnar log of every committed change (see
+		# "modules/history.py"), if history recording is enabled
+		self.history = None
 
 	def load_architecture(self, architecture):
-		self.func_unit_status = {
-			func_unit : {
-				func_unit_counter : {
-					"busy" : [False], 
-					"op": [None],
-					"f_i": [None],
-					"f_j": [None],
-					"f_k": [None],
-					"q_j": [None],
-					"q_k": [None],
-					"r_j": [True],
-					"r_k": [True],
-					"update_timers": [{
-						"clock" : -1, 
-						"changed_fields" : set(),
-						"changed_register_set" : set(),
-					}],
-
-				} for func_unit_counter in \
-					range(architecture["functional_units"][func_unit]["quantity"])
-
-			} for func_unit in architecture["functional_units"]
-		}
+		# All functional unit replicas, grouped by functional unit
+		# and in a single list (the position of each replica in this
+		# list is its "index")
+		self.func_unit_replicas = {}
+		self.replicas = []
 
-		self.reg_res_status = {
-			reg : [0] for reg in architecture["registers"]
-		}
+		for func_unit in architecture["functional_units"]:
+			self.func_unit_replicas[func_unit] = []
+			for func_unit_counter in \
+				range(architecture["functional_units"][func_unit]["quantity"]):
+
+				replica = FuncUnitReplica(func_unit,
+					func_unit_counter,
+					len(self.replicas))
+
+				self.func_unit_replicas[func_unit].append(replica)
+				self.replicas.append(replica)
+
+		# Architecture register set, which is never iterated: register
+		# state is kept only for the registers the program touches
+		self.architecture_registers = architecture["registers"]
 
 		# Keep a pointer to the dictionary delay of each pipeline stage
 		self.stage_delay = architecture["stage_delay"]
@@ -101,75 +295,531 @@ class Scoreboard:
 		# MIPS standard: 32 bits
 		self.WORD_SIZE = architecture["word_size"]
 
+		# Stage latency table of each (functional unit, additional
+		# cost) pair already seen (see "Scoreboard.__stage_latencies")
+		self.__stage_latency_tables = {}
+
+		self.reset()
+
+	def reset(self):
+		"""
+			Clean up all the simulation state, keeping the
+			loaded architecture, so the scoreboard can run
+			another instruction list (which must be loaded
+			again with "Scoreboard.load_instructions").
+		"""
+		self.inst_status = None
+		self.global_clock_timer = 0
+		self.update_timers = []
+
+		self.__inst_source = None
+		self.__inst_sink = None
+		self.__streaming = False
+
+		self.__dirty_replicas.clear()
+		self.__waiters_to_commit.clear()
+
+		for replica in self.replicas:
+			replica.reset()
+
+		# Registers are interned as integer ids (which index all
+		# register lists below) when first touched by the program,
+		# so the register state size depends only on the registers
+		# actually used, not on the architecture register set size
+		self.__reg_ids = {}
+		self.__reg_labels = []
+
+		# Register result status of each register id
+		self.__reg_res_status = []
+
+		# How many functional units are ready to read (but did not
+		# read yet) each register id, i.e. how many "f_j" (or "f_k")
+		# fields hold the register while "r_j" (or "r_k") is set
+		self.__reg_pending_readers = []
+
+		# Min-heap of the idle (not busy) replica indexes of
+		# each functional unit
+		self.__idle_replicas = {
+			func_unit : [replica.index
+				for replica in self.func_unit_replicas[func_unit]]
+			for func_unit in self.func_unit_replicas
+		}
+
+		# Functional unit replica bound to each instruction
+		# (identified by its PC) since its "issue" pipeline stage
+		self.__inst_replica = {}
+
+		# Stage latency table (see "Scoreboard.__stage_latencies")
+		# of each instruction since its "issue" pipeline stage, and
+		# the clock cycle in which its current pipeline stage cost
+		# is satisfied
+		self.__inst_latencies = {}
+		self.__inst_ready_clock = {}
+
+		if self.numpy_backend:
+			# Imported just now, so NumPy is never loaded (which
+			# takes longer than everything else in the startup)
+			# unless the NumPy backend is enabled
+			from modules.vectorized import ReadyWindow
+
+			self.__ready_window = ReadyWindow(self.WORD_SIZE,
+				self.PIPELINE_STAGES,
+				len(self.replicas))
+
+		if self.record_history:
+			self.history = ScoreboardHistory(\
+				[replica.key for replica in self.replicas],
+				self.__reg_labels)
+
 	def load_instructions(self, instructions):
+		"""
+			Load the instruction list (as returned by
+			"ReadFile.load_instructions"). The filepath of a
+			compiled program (see "modules/program.py") may be
+			given instead, which is memory-mapped.
+		"""
 		if self.WORD_SIZE <= 0:
 			raise UserWarning("Instruction size must be >= 1.",
 				"Use \"Scoreboard.load_architecture\"",
 				"to configure it correctly.")
 
+		if type(instructions) is str:
+			# Compiled programs hold just instruction labels, whose
+			# metadata comes from the current configuration (see
+			# "ReadFile.load_compiled_program")
+			from modules.readfile import ReadFile
+
+			instructions = ReadFile().load_compiled_program(instructions,
+				{
+					"functional_units" : self.functional_units,
+					"registers" : self.architecture_registers,
+					"word_size" : self.WORD_SIZE,
+				},
+				verify_reg=False)
+
+		program = instructions
+
 		# Identify the instructions by the PC
-		self.inst_status = {
-			(self.WORD_SIZE * inst_id) : {
-				stage_label : None
-				for stage_label in self.PIPELINE_STAGES
-			} for inst_id in range(len(instructions))
-		}
+		self.inst_status = InstructionStatus(self.PIPELINE_STAGES)
 
 		# PROGRAM_SIZE = #_of_Instructions * WORD_SIZE
-		self.PROGRAM_SIZE = max(self.inst_status) + self.WORD_SIZE
+		self.PROGRAM_SIZE = len(instructions) * self.WORD_SIZE
+
+		# Keep pointer to instruction list (straight to the
+		# decoded records, in case of a compiled program)
+		if isinstance(instructions, ProgramImage):
+			instructions = instructions.decoded
 
-		# Keep pointer to instruction list
 		self.instruction_list = instructions
 
-	def __get_cur_inst_replica_id(self, cur_inst_pc, cur_inst_func_unit):
-		# Recover the id of the functional unit replica
-		# used by the current instruction (in case it is
-		# not in the "issue" pipeline stage)
-		for replica_id in self.func_unit_status[cur_inst_func_unit]:
-			if self.func_unit_status[cur_inst_func_unit]\
-				[replica_id]["op"][-1] == cur_inst_pc:
-				return replica_id
-		return -1
+		# The instruction list as given, for verification runs
+		self.__program = program
+
+		self.__inst_source = None
+		self.__inst_sink = None
+		self.__streaming = False
 
-	def __inst_total_cost(self, cur_inst_pc, cur_inst_stage):
+	def load_instruction_stream(self, instructions, sink=None):
 		"""
-			Calculate total cost (in clock cycles)
-			of a given instruction identified by its
-			PC.
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+			Streaming alternative to "Scoreboard.load_instructions":
+			"instructions" may be any iterable (e.g. the generator
+			"ReadFile.iter_instructions"), which is consumed lazily
+			as the dispatched instruction window moves forward.
+
+			Every retired instruction (i.e. all instructions before
+			the oldest not completed one) is removed from the
+			"inst_status" and passed, in program order, to the
+			"sink" callable as sink(pc, inst_pack, inst_status),
+			so the memory used is bounded by the instruction
+			window, not by the instruction stream length (as long
+			as "record_history" is disabled, as the history keeps
+			every change).
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
-		total_cost = 0
+		if self.WORD_SIZE <= 0:
+			raise UserWarning("Instruction size must be >= 1.",
+				"Use \"Scoreboard.load_architecture\"",
+				"to configure it correctly.")
 
-		cur_inst_metadata = self.instruction_list[\
-			cur_inst_pc // self.WORD_SIZE]
+		# Both are indexed just like with the whole instruction
+		# list, but only keep the instruction window
+		self.inst_status = {}
+		self.instruction_list = {}
 
-		cur_inst_func_unit = cur_inst_metadata["functional_unit"]
+		# Size of the instructions read from the stream so far
+		self.PROGRAM_SIZE = 0
+
+		# PC of the next instruction to be retired
+		self.__retire_pc = 0
+
+		self.__inst_source = iter(instructions)
+		self.__inst_sink = sink
+		self.__streaming = True
+		self.__program = None
+
+	def __inst_available(self, inst_pc):
+		"""
+			Check if there is an instruction in the given PC,
+			reading the next instruction from the instruction
+			stream if needed.
+		"""
+		if inst_pc < self.PROGRAM_SIZE:
+			return True
+
+		if self.__inst_source is None:
+			return False
+
+		inst_pack = next(self.__inst_source, None)
+
+		if inst_pack is None:
+			# End of the instruction stream
+			self.__inst_source = None
+			return False
+
+		self.inst_status[self.PROGRAM_SIZE] = {
+			stage_label : None
+			for stage_label in self.PIPELINE_STAGES
+		}
+		self.instruction_list[self.PROGRAM_SIZE // self.WORD_SIZE] = inst_pack
+
+		self.PROGRAM_SIZE += self.WORD_SIZE
+
+		return inst_pc < self.PROGRAM_SIZE
+
+	def __retire_insts(self, cur_min_pc):
+		"""
+			Flush all instructions before the given PC to the
+			retired instruction sink (streaming mode only).
+		"""
+		while self.__retire_pc < cur_min_pc:
+			inst_status = self.inst_status.pop(self.__retire_pc)
+			inst_pack = self.instruction_list.pop(\
+				self.__retire_pc // self.WORD_SIZE)
+
+			if self.__inst_sink is not None:
+				self.__inst_sink(self.__retire_pc, inst_pack, inst_status)
+
+			self.__retire_pc += self.WORD_SIZE
+
+	def run_many(self, programs, result_cache=None):
+		"""
+			Run every given instruction list against the loaded
+			architecture, returning the list of answers (in the
+			same format of "Scoreboard.run").
+
+			All architecture structures are built just once and
+			reused, with a cheap reset between programs. If a
+			"ResultCache" is given, programs whose result is
+			already cached are not simulated again.
+		"""
+		answers = []
+
+		for instructions in programs:
+			if result_cache is not None:
+				answers.append(result_cache.run(self, instructions))
+				continue
+
+			self.reset()
+			self.load_instructions(instructions)
+			answers.append(self.run())
+
+		return answers
+
+	def __intern_reg(self, register_label):
+		"""
+			Return the integer id of the given register label,
+			creating a new one if the register was never seen
+			before.
+		"""
+		if register_label not in self.__reg_ids:
+			self.__reg_ids[register_label] = len(self.__reg_labels)
+			self.__reg_labels.append(register_label)
+			self.__reg_res_status.append(0)
+			self.__reg_pending_readers.append(0)
+
+		return self.__reg_ids[register_label]
+
+	def register_label(self, register_id):
+		"""
+			Return the register label of the given register id,
+			if any.
+		"""
+		if register_id is None:
+			return None
+		return self.__reg_labels[register_id]
+
+	def __get_cur_inst_replica(self, cur_inst_pc):
+		# Recover the functional unit replica used by
+		# the current instruction (in case it is not
+		# in the "issue" pipeline stage)
+		return self.__inst_replica.get(cur_inst_pc)
+
+	def __stage_latencies(self, inst_metadata):
+		"""
+			Return the stage latency table of the given instruction:
+			the cost (in clock cycles) of the pipeline stage after
+			each pipeline stage, so an instruction which finished a
+			stage in clock "c" may finish the next one from clock
+			"c + table[stage]" on. Tables depend only on the
+			functional unit and additional cost, so each one is
+			built just once.
+		"""
+		cur_inst_func_unit = inst_metadata["functional_unit"]
+		additional_cost = inst_metadata.get("additional_cost", 0)
+
+		table_key = (cur_inst_func_unit, additional_cost)
+
+		if table_key not in self.__stage_latency_tables:
+			latency_table = {}
+
+			for cur_inst_stage, next_inst_stage in self.NEXT_STAGE.items():
+				if next_inst_stage is None:
+					continue
+
+				total_cost = self.stage_delay.get(next_inst_stage, 0)
+
+				if next_inst_stage == "execution":
+					total_cost += self.functional_units\
+						[cur_inst_func_unit]["clock_cycles"] + additional_cost
+
+				latency_table[cur_inst_stage] = total_cost
+
+			self.__stage_latency_tables[table_key] = latency_table
+
+		return self.__stage_latency_tables[table_key]
+
+	def __next_event_clock(self, inst_cur_stage):
+		"""
+			Calculate the next clock cycle in which any of the
+			active instructions may change its pipeline stage,
+			assuming that the scoreboard state did not change in
+			the current clock cycle.
+
+			Instructions in the "issue" pipeline stage, or whose
+			stage cost is already satisfied, can only proceed after
+			some other instruction changes the scoreboard state, so
+			only the pending stage costs are taken into account.
+		"""
+		next_clock = None
+
+		if self.__ready_window is not None:
+			next_clock = self.__ready_window.next_ready_clock(\
+				self.global_clock_timer)
+
+		else:
+			# Only instructions past the "issue" stage have a ready clock
+			for inst_ready_clock in self.__inst_ready_clock.values():
+				if inst_ready_clock > self.global_clock_timer and \
+					(next_clock is None or inst_ready_clock < next_clock):
+					next_clock = inst_ready_clock
+
+		# No pending stage cost at all: nothing can change anymore,
+		# so just keep the standard clock-by-clock behaviour
+		if next_clock is None:
+			next_clock = 1 + self.global_clock_timer
+
+		return next_clock
+
+	def __steady_state(self, inst_cur_stage, cur_min_pc, cur_max_pc):
+		"""
+			Return the current scoreboard state relative to the
+			oldest active instruction PC and to the current clock
+			cycle, i.e. everything the next clock cycles depend on
+			(besides the instructions themselves).
+		"""
+		FIRST_PIPELINE_STAGE = self.PIPELINE_STAGES[0]
+
+		# Pipeline stage of each active instruction, alongside
+		# when its stage cost is satisfied and its replica
+		window_state = []
+		for cur_inst_pc in inst_cur_stage:
+			cur_inst_stage = inst_cur_stage[cur_inst_pc]
+
+			if cur_inst_stage == FIRST_PIPELINE_STAGE:
+				window_state.append((cur_inst_pc - cur_min_pc,
+					cur_inst_stage))
+			else:
+				window_state.append((cur_inst_pc - cur_min_pc,
+					cur_inst_stage,
+					self.__inst_ready_clock[cur_inst_pc] -\
+						self.global_clock_timer,
+					self.__inst_replica[cur_inst_pc].index))
+
+		# The register result status and the waiters of every replica
+		# are not needed: a register is produced by the busy replica
+		# whose "f_i" holds it, and a replica waits for the ones in
+		# its "q_j" and "q_k"
+		replica_state = tuple((
+				replica.busy,
+				replica.op - cur_min_pc if replica.op is not None else None,
+				replica.f_i, replica.f_j, replica.f_k,
+				replica.q_j.key if replica.q_j else replica.q_j,
+				replica.q_k.key if replica.q_k else replica.q_k,
+				replica.r_j, replica.r_k,
+			) for replica in self.replicas)
+
+		return (cur_max_pc - cur_min_pc,
+			tuple(window_state),
+			replica_state)
+
+	def __inst_timing(self, inst_id):
+		inst_pack = self.instruction_list[inst_id]
+		return tuple(inst_pack.get(field) for field in self.TIMING_FIELDS)
+
+	def __extrapolate_loop(self,
+		steady_states,
+		inst_cur_stage,
+		cur_min_pc,
+		cur_max_pc):
+		"""
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+			Look for a periodic scoreboard state: if the current
+			state (see "Scoreboard.__steady_state") is the same of
+			a previous one, "inst_shift" instructions and
+			"clock_shift" clock cycles ago, and the instructions
+			from there on repeat every "inst_shift" instructions,
+			then the simulation between both states repeats just
+			the same way (shifted by "inst_shift" instructions and
+			"clock_shift" clock cycles) as long as the instructions
+			keep repeating.
+
+			So, as many whole repetitions as the repeated instruction
+			block allows are extrapolated at once: the instruction
+			status of every skipped instruction is copied from the
+			last repetition simulated (plus the clock shift) and the
+			scoreboard state is just shifted forward.
+
+			Returns the PC shift of the dispatched instruction window
+			(which "inst_cur_stage" was already updated to), or zero
+			if nothing was extrapolated.
+			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		"""
+		state = self.__steady_state(inst_cur_stage, cur_min_pc, cur_max_pc)
+
+		if state not in steady_states:
+			if len(steady_states) >= self.STEADY_STATE_MAX_SAMPLES:
+				steady_states.clear()
+
+			steady_states[state] = (self.global_clock_timer, cur_min_pc)
+			return 0
+
+		prev_clock, prev_min_pc = steady_states[state]
+		steady_states[state] = (self.global_clock_timer, cur_min_pc)
+
+		inst_shift = (cur_min_pc - prev_min_pc) // self.WORD_SIZE
+		clock_shift = self.global_clock_timer - prev_clock
+
+		# Find where the repeated instruction block ends
+		inst_num = self.PROGRAM_SIZE // self.WORD_SIZE
+		block_end = cur_min_pc // self.WORD_SIZE
+		while block_end < inst_num and \
+			self.__inst_timing(block_end) == \
+			self.__inst_timing(block_end - inst_shift):
+			block_end += 1
+
+		# Every repetition reads (at most) the instructions up to one
+		# past the most recently dispatched one, shifted, which must
+		# be still within the repeated instruction block
+		last_read_inst = cur_max_pc // self.WORD_SIZE + 1
+		repetitions = (block_end - 1 - last_read_inst) // inst_shift
+
+		if repetitions <= 0:
+			return 0
+
+		pc_shift = inst_shift * self.WORD_SIZE
+
+		# Every instruction status change between both states
+		changes = []
+		for cur_inst_pc in range(prev_min_pc, cur_max_pc + self.WORD_SIZE, self.WORD_SIZE):
+			cur_inst_status = self.inst_status[cur_inst_pc]
+			for stage_label in self.PIPELINE_STAGES:
+				stage_clock = cur_inst_status[stage_label]
+				if stage_clock is not None and stage_clock > prev_clock:
+					changes.append((cur_inst_pc, stage_label, stage_clock))
+
+		for repetition in range(1, 1 + repetitions):
+			for cur_inst_pc, stage_label, stage_clock in changes:
+				self.inst_status[cur_inst_pc + repetition * pc_shift]\
+					[stage_label] = stage_clock + repetition * clock_shift
+
+		pc_shift *= repetitions
+		clock_shift *= repetitions
+
+		self.global_clock_timer += clock_shift
+		self.update_timers = [update_timer + clock_shift
+			for update_timer in self.update_timers]
 
-		if cur_inst_stage == "execution":
-			total_cost += self.functional_units[cur_inst_func_unit]["clock_cycles"]
-			if "additional_cost" in cur_inst_metadata:
-				total_cost += cur_inst_metadata["additional_cost"]
+		for replica in self.replicas:
+			if replica.op is not None:
+				replica.op += pc_shift
 
-		if cur_inst_stage in self.stage_delay:
-			total_cost += self.stage_delay[cur_inst_stage]
+		self.__inst_replica = {cur_inst_pc + pc_shift : replica
+			for cur_inst_pc, replica in self.__inst_replica.items()}
 
-		total_cost += self.inst_status[cur_inst_pc]\
-			[self.PIPELINE_STAGES[self.PIPELINE_STAGES.\
-				index(cur_inst_stage) - 1]]
+		self.__inst_latencies = {cur_inst_pc + pc_shift : latency_table
+			for cur_inst_pc, latency_table in self.__inst_latencies.items()}
 
-		return total_cost
+		self.__inst_ready_clock = {cur_inst_pc + pc_shift : \
+				inst_ready_clock + clock_shift
+			for cur_inst_pc, inst_ready_clock in self.__inst_ready_clock.items()}
+
+		shifted_inst_cur_stage = {cur_inst_pc + pc_shift : cur_inst_stage
+			for cur_inst_pc, cur_inst_stage in inst_cur_stage.items()}
+		inst_cur_stage.clear()
+		inst_cur_stage.update(shifted_inst_cur_stage)
+
+		if self.__ready_window is not None:
+			self.__ready_window.clear()
+
+			for cur_inst_pc, cur_inst_stage in inst_cur_stage.items():
+				self.__ready_window.dispatch(cur_inst_pc)
+
+				if cur_inst_pc in self.__inst_ready_clock:
+					self.__ready_window.advance(cur_inst_pc,
+						cur_inst_stage,
+						self.__inst_ready_clock[cur_inst_pc],
+						self.__inst_replica[cur_inst_pc].index)
+
+		# Clock cycles of the previous states are meaningless now
+		steady_states.clear()
+
+		return pc_shift
+
+	def __verify_extrapolation(self, ans):
+		"""
+			Run the current program again, without steady-state
+			extrapolation, and check if the answer is the same.
+		"""
+		reference = Scoreboard(\
+			update_flags_stage="update_flags" in self.PIPELINE_STAGES,
+			skip_idle_clocks=self.skip_idle_clocks,
+			record_history=False,
+			extrapolate_loops=False)
+
+		reference.load_architecture({
+			"functional_units" : self.functional_units,
+			"registers" : self.architecture_registers,
+			"stage_delay" : self.stage_delay,
+			"word_size" : self.WORD_SIZE,
+		})
+		reference.load_instructions(self.__program)
+		reference_ans = reference.run()
+
+		for field in ("inst_status", "func_unit_status",
+			"reg_dest_status", "update_timers"):
+			if ans[field] != reference_ans[field]:
+				raise Exception("Steady-state extrapolation does not match " +\
+					"the full simulation (\"" + field + "\" differs).")
 
 	def __check_inst_ready(self, cur_inst_pc, cur_inst_stage):
 		# Take into account scoreboarding wait tests +
 		# clock costs and global clock counter
 
 		if cur_inst_stage != "issue":
-			inst_total_cost = self.__inst_total_cost(\
-				cur_inst_pc,
-				cur_inst_stage)
-
 			# Check if current global clock counter already
 			# satisfies current instruction pipeline stage cost
-			if inst_total_cost > self.global_clock_timer:
+			if self.__inst_ready_clock[cur_inst_pc] > self.global_clock_timer:
 				# Pipeline stage of this instruction not
 				# ready yet, return False
 				return False
@@ -181,8 +831,7 @@ class Scoreboard:
 		cur_inst_func_unit = cur_inst_metadata["functional_unit"]
 
 		if cur_inst_stage != "issue":
-			cur_inst_replica_id = self.__get_cur_inst_replica_id(\
-				cur_inst_pc, cur_inst_func_unit)
+			cur_replica = self.__get_cur_inst_replica(cur_inst_pc)
 
 		if cur_inst_stage == "issue":
 			"""
@@ -191,20 +840,20 @@ class Scoreboard:
 				~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			"""
 			if "reg_dest" in cur_inst_metadata:
-				cur_inst_reg_dest = cur_inst_metadata["reg_dest"]
+				cur_inst_reg_dest = self.__intern_reg(\
+					cur_inst_metadata["reg_dest"])
 			else:
 				cur_inst_reg_dest = None
 
 			# Check if destiny register (f_i) is not being produced
 			# by another functional unit
-			if cur_inst_reg_dest is None or not self.reg_res_status[cur_inst_reg_dest][-1]:
+			if cur_inst_reg_dest is None or \
+				not self.__reg_res_status[cur_inst_reg_dest]:
 
 				# Check if there is at least one idle replica of this
 				# instruction desired functional unit
-				for replica_id in self.func_unit_status[cur_inst_func_unit]:
-					if not self.func_unit_status[cur_inst_func_unit]\
-						[replica_id]["busy"][-1]:
-						return True
+				if self.__idle_replicas[cur_inst_func_unit]:
+					return True
 
 		elif cur_inst_stage == "read_operands":
 			"""
@@ -213,10 +862,7 @@ class Scoreboard:
 				~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			"""
 
-			if self.func_unit_status[cur_inst_func_unit]\
-				[cur_inst_replica_id]["r_j"][-1] and \
-				self.func_unit_status[cur_inst_func_unit]\
-				[cur_inst_replica_id]["r_k"][-1]:
+			if cur_replica.r_j and cur_replica.r_k:
 				return True
 
 		elif cur_inst_stage == "execution":
@@ -233,24 +879,13 @@ class Scoreboard:
 				Pipeline "Write Result" stage
 				~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 			"""
-			cur_inst_f_i = self.func_unit_status[cur_inst_func_unit]\
-				[cur_inst_replica_id]["f_i"][-1]
-
-			if cur_inst_f_i is not None:
-				for loop_func_unit_label in self.func_unit_status:
-					for replica_id in self.func_unit_status[loop_func_unit_label]:
-						loop_cur_func_unit = self.func_unit_status\
-							[loop_func_unit_label][replica_id]
-
-						if len(loop_cur_func_unit["f_j"]) and \
-							loop_cur_func_unit["f_j"][-1] == cur_inst_f_i and\
-							loop_cur_func_unit["r_j"][-1]:
-							return False
+			cur_inst_f_i = cur_replica.f_i
 
-						if len(loop_cur_func_unit["f_k"]) and \
-							loop_cur_func_unit["f_k"][-1] == cur_inst_f_i and\
-							loop_cur_func_unit["r_k"][-1]:
-							return False
+			# Check if any functional unit still needs to read
+			# the old value of the destiny register (WAR hazard)
+			if cur_inst_f_i is not None and \
+				self.__reg_pending_readers[cur_inst_f_i]:
+				return False
 
 			return True
 		else:
@@ -282,34 +917,29 @@ class Scoreboard:
 		}
 
 		if cur_inst_type == "R":
-			issue_pack["f_i"] = cur_inst_metadata["reg_dest"]
-			issue_pack["f_j"] = cur_inst_metadata["reg_source_j"]
-			issue_pack["f_k"] = cur_inst_metadata["reg_source_k"]
-			issue_pack["q_j"] = self.reg_res_status[\
-				cur_inst_metadata["reg_source_j"]][-1]
-			issue_pack["q_k"] = self.reg_res_status[\
-				cur_inst_metadata["reg_source_k"]][-1]
+			issue_pack["f_i"] = self.__intern_reg(cur_inst_metadata["reg_dest"])
+			issue_pack["f_j"] = self.__intern_reg(cur_inst_metadata["reg_source_j"])
+			issue_pack["f_k"] = self.__intern_reg(cur_inst_metadata["reg_source_k"])
+			issue_pack["q_j"] = self.__reg_res_status[issue_pack["f_j"]]
+			issue_pack["q_k"] = self.__reg_res_status[issue_pack["f_k"]]
 			issue_pack["r_j"] = issue_pack["q_j"] == 0
 			issue_pack["r_k"] = issue_pack["q_k"] == 0
 
 		elif cur_inst_type == "I":
 
 			if "reg_dest" in cur_inst_metadata:
-				issue_pack["f_i"] = cur_inst_metadata["reg_dest"]
+				issue_pack["f_i"] = self.__intern_reg(cur_inst_metadata["reg_dest"])
 
 			if "reg_source" in cur_inst_metadata:
-				issue_pack["f_j"] = cur_inst_metadata["reg_source"]
-				issue_pack["q_j"] = self.reg_res_status[\
-					cur_inst_metadata["reg_source"]][-1]
+				issue_pack["f_j"] = self.__intern_reg(cur_inst_metadata["reg_source"])
+				issue_pack["q_j"] = self.__reg_res_status[issue_pack["f_j"]]
 				issue_pack["r_k"] = True
 
 			elif "reg_source_k" in cur_inst_metadata:
-				issue_pack["f_j"] = cur_inst_metadata["reg_source_j"]
-				issue_pack["f_k"] = cur_inst_metadata["reg_source_k"]
-				issue_pack["q_j"] = self.reg_res_status[\
-					cur_inst_metadata["reg_source_j"]][-1]
-				issue_pack["q_k"] = self.reg_res_status[\
-					cur_inst_metadata["reg_source_k"]][-1]
+				issue_pack["f_j"] = self.__intern_reg(cur_inst_metadata["reg_source_j"])
+				issue_pack["f_k"] = self.__intern_reg(cur_inst_metadata["reg_source_k"])
+				issue_pack["q_j"] = self.__reg_res_status[issue_pack["f_j"]]
+				issue_pack["q_k"] = self.__reg_res_status[issue_pack["f_k"]]
 				issue_pack["r_k"] = issue_pack["q_k"] == 0
 
 			issue_pack["r_j"] = issue_pack["q_j"] == 0
@@ -320,46 +950,27 @@ class Scoreboard:
 
 		return issue_pack
 
-	def __update_flags(self, cur_inst_func_unit, cur_inst_replica_id):
+	def __stage_changes(self, replica):
+		"""
+			Mark the given functional unit replica as changed in
+			the current clock cycle (even if no field changes),
+			so its staged changes are committed by the end of it.
+		"""
+		if not replica.dirty:
+			replica.dirty = True
+			self.__dirty_replicas.append(replica)
+
+	def __update_flags(self, cur_replica):
 		# For all functional units waiting for the
 		# current functional unit finalize for any of
 		# the operand register, set the ready flags to true
-		for loop_func_unit_label in self.func_unit_status:
-			for loop_replica_id in self.func_unit_status[loop_func_unit_label]:
-				loop_cur_func_unit = self.func_unit_status\
-					[loop_func_unit_label][loop_replica_id]
-
-				if loop_func_unit_label not in self.__to_commit_this_clock:
-					self.__to_commit_this_clock[loop_func_unit_label] = {}
-				if loop_replica_id not in self.__to_commit_this_clock[loop_func_unit_label]:
-					self.__to_commit_this_clock[loop_func_unit_label][loop_replica_id] = {
-						"fields" : {},
-						"registers" : {},
-					}
-
-				loop_cur_func_unit_aux = self.__to_commit_this_clock\
-					[loop_func_unit_label][loop_replica_id]["fields"]
-					
-				loop_cur_changed_field_set = set()
-
-				if len(loop_cur_func_unit["q_k"]) and\
-					loop_cur_func_unit["q_k"][-1] == \
-						(cur_inst_func_unit, cur_inst_replica_id):
-					loop_cur_func_unit_aux["r_k"] = True
-					loop_cur_changed_field_set.update({"r_k"})
-
-				if len(loop_cur_func_unit["q_j"]) and\
-					loop_cur_func_unit["q_j"][-1] == \
-						(cur_inst_func_unit, cur_inst_replica_id):
-					loop_cur_func_unit_aux["r_j"] = True
-					loop_cur_changed_field_set.update({"r_j"})
-
-				if loop_cur_changed_field_set:
-					loop_cur_func_unit_aux["update_timers"] = {\
-						"clock" : self.global_clock_timer,
-						"changed_fields" : loop_cur_changed_field_set,
-						"changed_registers" : set(),
-					}
+		for loop_replica in cur_replica.waiters:
+			self.__stage_changes(loop_replica)
+
+			loop_cur_func_unit_aux = loop_replica.staged_fields
+
+			for ready_flag in cur_replica.waiters[loop_replica]:
+				loop_cur_func_unit_aux[ready_flag] = True
 		return 
 
 	def __bookkeep(self, 
@@ -376,21 +987,21 @@ class Scoreboard:
 			# Find which functional unit replica the
 			# current instruction was allocated in
 			# "issue" pipeline stage
-			cur_inst_replica_id = self.__get_cur_inst_replica_id(\
-				cur_inst_pc, cur_inst_func_unit)
+			cur_replica = self.__get_cur_inst_replica(cur_inst_pc)
 
 		else:
 			# Find the next idle functional unit replica of the
 			# desired type for the current instruction at the
-			# "issue" pipeline stage
-			cur_inst_replica_id = -1
-			for replica_id in self.func_unit_status[cur_inst_func_unit]:
-				if not self.func_unit_status[cur_inst_func_unit][replica_id]["busy"][-1]:
-					cur_inst_replica_id = replica_id
-					break
+			# "issue" pipeline stage (the one with the lowest id)
+			cur_replica = self.replicas[\
+				self.__idle_replicas[cur_inst_func_unit][0]]
+
+			# Bind the current instruction to the chosen replica
+			# until it leaves the pipeline
+			self.__inst_replica[cur_inst_pc] = cur_replica
 
-		cur_func_unit_status = self.func_unit_status\
-			[cur_inst_func_unit][cur_inst_replica_id]
+			self.__inst_latencies[cur_inst_pc] = \
+				self.__stage_latencies(cur_inst_metadata)
 
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -400,18 +1011,10 @@ class Scoreboard:
 		# Auxiliary data structure to keep all changes of
 		# the current clock to prevent interference between
 		# instructions within the same clock cycle
-		if cur_inst_func_unit not in self.__to_commit_this_clock:
-			self.__to_commit_this_clock[cur_inst_func_unit] = {}
-		if cur_inst_replica_id not in self.__to_commit_this_clock[cur_inst_func_unit]:
-			self.__to_commit_this_clock[cur_inst_func_unit][cur_inst_replica_id] = {
-				"fields" : {},
-				"registers" : {},
-			}
+		self.__stage_changes(cur_replica)
 
-		cur_func_unit_status_aux = self.__to_commit_this_clock\
-			[cur_inst_func_unit][cur_inst_replica_id]["fields"]
-		cur_registers_status_aux = self.__to_commit_this_clock\
-			[cur_inst_func_unit][cur_inst_replica_id]["registers"]
+		cur_func_unit_status_aux = cur_replica.staged_fields
+		cur_registers_status_aux = cur_replica.staged_registers
 
 		"""
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -419,14 +1022,6 @@ class Scoreboard:
 			~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		"""
 
-		# Keep track of which scoreboard field are changed
-		# in this bookkepping call
-		changed_field_set = set()
-
-		# The same as above, but with the destiny register
-		# status list
-		changed_register_set = set()
-
 		# Bookkeep based on the current instruction
 		# pipeline stage
 		if cur_inst_stage == "issue":
@@ -446,15 +1041,17 @@ class Scoreboard:
 				cur_func_unit_status_aux[field] = issue_pack[field]
 
 			if issue_pack["f_i"] is not None:
-				cur_registers_status_aux[issue_pack["f_i"]] =\
-					(cur_inst_func_unit, cur_inst_replica_id)
-				changed_register_set.update({issue_pack["f_i"]})
-
-			changed_field_set.update({
-				"busy", "op", "f_i", 
-				"f_j", "f_k", "q_j", 
-				"q_k", "r_j", "r_k"
-			})
+				cur_registers_status_aux[issue_pack["f_i"]] = cur_replica
+
+			# Register the current functional unit as a waiter of
+			# the functional units producing its operand registers
+			for q_field, ready_flag in (("q_j", "r_j"), ("q_k", "r_k")):
+				if issue_pack[q_field]:
+					self.__waiters_to_commit.append((\
+						issue_pack[q_field],
+						cur_replica,
+						ready_flag,
+						True))
 
 		elif cur_inst_stage == "read_operands":
 			"""
@@ -467,7 +1064,16 @@ class Scoreboard:
 			cur_func_unit_status_aux["q_j"] = 0
 			cur_func_unit_status_aux["q_k"] = 0
 
-			changed_field_set.update({"r_j", "r_k", "q_j", "q_k"})
+			# Operands were read, so the current functional unit
+			# does not wait for any other functional unit anymore
+			for producer, ready_flag in \
+				((cur_replica.q_j, "r_j"), (cur_replica.q_k, "r_k")):
+				if producer:
+					self.__waiters_to_commit.append((\
+						producer,
+						cur_replica,
+						ready_flag,
+						False))
 
 		elif cur_inst_stage == "execution":
 			"""
@@ -487,21 +1093,17 @@ class Scoreboard:
 			# units waiting for the current functional_unit
 			# destiny register
 			if self.PIPELINE_STAGES[-1] == "write_result":
-				self.__update_flags(\
-					cur_inst_func_unit, 
-					cur_inst_replica_id)
+				self.__update_flags(cur_replica)
 
 			# Current functional unit current register
-			cur_inst_f_i = cur_func_unit_status["f_i"][-1]
+			cur_inst_f_i = cur_replica.f_i
 
 			# The destiny register of the current instruction
 			# does not depend of any functional unit anymore
 			if cur_inst_f_i is not None:
 				cur_registers_status_aux[cur_inst_f_i] = 0
-				changed_register_set.update({cur_inst_f_i})
 
 			cur_func_unit_status_aux["busy"] = False
-			changed_field_set.update({"busy"})
 
 		else:
 			"""
@@ -516,65 +1118,207 @@ class Scoreboard:
 				write in a register and the second one reads from
 				the same register).
 			"""
-			self.__update_flags(\
-				cur_inst_func_unit,
-				cur_inst_replica_id)
+			self.__update_flags(cur_replica)
 
 		# Mark the current clock cycle plus stage cost in the
 		# instruction status
 		self.inst_status[cur_inst_pc][cur_inst_stage] =\
 			self.global_clock_timer
 
-		# Keep track of which clock corresponds to
-		# the current change in order to print corre-
-		# ctly after process ends
-		if changed_field_set or changed_register_set:
-			cur_func_unit_status_aux["update_timers"] = {\
-				"clock" : self.global_clock_timer,
-				"changed_fields" : changed_field_set,
-				"changed_registers" : changed_register_set,
-			}
-		
+		if self.change_sink is not None:
+			self.change_sink.stage(self.global_clock_timer,
+				cur_inst_pc,
+				cur_inst_stage)
+
 		# Check if instruction was completed
-		if cur_inst_stage != self.PIPELINE_STAGES[-1]:
-			return self.PIPELINE_STAGES[1 + \
-				self.PIPELINE_STAGES.index(cur_inst_stage)]
+		next_inst_stage = self.NEXT_STAGE[cur_inst_stage]
+		if next_inst_stage is not None:
+			self.__inst_ready_clock[cur_inst_pc] = self.global_clock_timer +\
+				self.__inst_latencies[cur_inst_pc][cur_inst_stage]
+
+			if self.__ready_window is not None:
+				self.__ready_window.advance(cur_inst_pc,
+					next_inst_stage,
+					self.__inst_ready_clock[cur_inst_pc],
+					cur_replica.index)
+
+			return next_inst_stage
+
+		# Instruction left the pipeline, so it is not bound
+		# to its functional unit replica anymore
+		self.__inst_replica.pop(cur_inst_pc)
+		self.__inst_latencies.pop(cur_inst_pc)
+		self.__inst_ready_clock.pop(cur_inst_pc)
+
+		if self.__ready_window is not None:
+			self.__ready_window.retire(cur_inst_pc)
+
 		return None
 
+	def __count_pending_readers(self, replica, delta):
+		"""
+			Add "delta" to the pending readers counter of each
+			operand register the given functional unit is ready
+			to read.
+		"""
+		if replica.f_j is not None and replica.r_j:
+			self.__reg_pending_readers[replica.f_j] += delta
+
+		if replica.f_k is not None and replica.r_k:
+			self.__reg_pending_readers[replica.f_k] += delta
+
+	def __update_idle_replicas(self, replica, is_busy):
+		idle_replicas = self.__idle_replicas[replica.func_unit]
+
+		if is_busy and not replica.busy:
+			# The replica allocated in the "issue" pipeline
+			# stage is always the idle one with the lowest id
+			if idle_replicas[0] == replica.index:
+				heapq.heappop(idle_replicas)
+			else:
+				idle_replicas.remove(replica.index)
+				heapq.heapify(idle_replicas)
+
+		elif replica.busy and not is_busy:
+			heapq.heappush(idle_replicas, replica.index)
+
 	def __commit_changes(self):
-		if self.__to_commit_this_clock:
+		if self.__dirty_replicas:
 			# Keep track of which clock cycles correspond
 			# to a change in the scoreboard structure to
 			# made user interface easier to implement
-			self.update_timers.append(self.global_clock_timer)
+			if self.record_history:
+				self.update_timers.append(self.global_clock_timer)
+			elif self.update_timers:
+				# Just the last one is kept
+				self.update_timers[0] = self.global_clock_timer
+			else:
+				self.update_timers.append(self.global_clock_timer)
+
+			for replica in self.__dirty_replicas:
+				# Do fields changes
+				cur_f_u_field_changes = replica.staged_fields
+
+				# Keep the register pending readers counters
+				# in sync with the operand fields and flags
+				readers_changed = not self.READER_FIELDS.\
+					isdisjoint(cur_f_u_field_changes)
+				if readers_changed:
+					self.__count_pending_readers(replica, -1)
 
-			for func_unit_label in self.__to_commit_this_clock:
-				for replica_id in self.__to_commit_this_clock[func_unit_label]:
-					cur_func_unit_changes = \
-						self.__to_commit_this_clock[func_unit_label][replica_id]
-					cur_func_unit_status = \
-						self.func_unit_status[func_unit_label][replica_id]
+				# Keep the idle replica heap in sync with
+				# the "busy" field
+				if "busy" in cur_f_u_field_changes:
+					self.__update_idle_replicas(replica,
+						cur_f_u_field_changes["busy"])
 
-					# Do fields changes
-					cur_f_u_field_changes = cur_func_unit_changes["fields"]
+				for field in cur_f_u_field_changes:
+					setattr(replica, field, cur_f_u_field_changes[field])
+
+				if readers_changed:
+					self.__count_pending_readers(replica, +1)
+
+					if self.__ready_window is not None:
+						self.__ready_window.operands_ready[replica.index] = \
+							replica.r_j and replica.r_k
+
+				# Do register changes
+				cur_f_u_reg_changes = replica.staged_registers
+
+				for register_id in cur_f_u_reg_changes:
+					self.__reg_res_status[register_id] = \
+						cur_f_u_reg_changes[register_id]
+
+				# Keep the changes in the scoreboard history
+				if self.history is not None:
 					for field in cur_f_u_field_changes:
-						cur_func_unit_status[field].append(\
+						self.history.log(self.global_clock_timer,
+							replica,
+							field,
 							cur_f_u_field_changes[field])
 
-					# Do register changes
-					cur_f_u_reg_changes = cur_func_unit_changes["registers"]
+					for register_id in cur_f_u_reg_changes:
+						self.history.log_register(self.global_clock_timer,
+							replica,
+							register_id,
+							cur_f_u_reg_changes[register_id])
+
+				if self.change_sink is not None:
+					for field in cur_f_u_field_changes:
+						self.change_sink.field(self.global_clock_timer,
+							replica.key,
+							field,
+							self.__public_value(field,
+								cur_f_u_field_changes[field]))
+
+					for register_id in cur_f_u_reg_changes:
+						self.change_sink.register(self.global_clock_timer,
+							self.register_label(register_id),
+							self.__public_value(None,
+								cur_f_u_reg_changes[register_id]))
+
+				# Clean up the committed changes (keeping the
+				# staging structures)
+				cur_f_u_field_changes.clear()
+				cur_f_u_reg_changes.clear()
+				replica.dirty = False
+
+			self.__dirty_replicas.clear()
+
+			if self.history is not None:
+				self.history.end_clock(self.global_clock_timer)
+
+		# Do functional unit waiters reverse index changes
+		for producer, consumer, ready_flag, is_waiting in self.__waiters_to_commit:
+			if is_waiting:
+				if consumer not in producer.waiters:
+					producer.waiters[consumer] = set()
+				producer.waiters[consumer].update({ready_flag})
+			elif consumer in producer.waiters:
+				producer.waiters.pop(consumer)
+
+		self.__waiters_to_commit.clear()
+
+	def __public_value(self, field, val):
+		"""
+			Convert a value of the given functional unit field
+			(or register result status, if "field" is None) back
+			to its public format: register labels and (functional
+			unit label, replica id) pairs.
+		"""
+		if field in self.REGISTER_FIELDS:
+			return self.register_label(val)
 
-					for register_label in cur_f_u_reg_changes:
-						self.reg_res_status[register_label].append(\
-							cur_f_u_reg_changes[register_label])
+		if field is None or field in self.PRODUCER_FIELDS:
+			return val.key if val else val
 
-		# Clean up all changes
-		self.__to_commit_this_clock = {}
+		return val
+
+	def __build_answer(self):
+		"""
+			Materialize the public functional unit and register
+			result status of the current scoreboard state.
+		"""
+		func_unit_status = {
+			func_unit : {
+				replica.replica_id : {
+					field : self.__public_value(field, getattr(replica, field))
+					for field in self.FUNC_UNIT_FIELDS
+				} for replica in self.func_unit_replicas[func_unit]
+			} for func_unit in self.func_unit_replicas
+		}
+
+		reg_res_status = {
+			self.register_label(register_id) : \
+				self.__public_value(None, reg_res)
+			for register_id, reg_res in enumerate(self.__reg_res_status)
+		}
+
+		return func_unit_status, reg_res_status
 
 	def run(self):
 		# Check if user called "load_architecture" method before
-		if self.func_unit_status is None or \
-			self.reg_res_status is None:
+		if self.replicas is None:
 			raise UserWarning("Can't find architecture information.",
 				"Please use \"Scoreboard.load_architecture\"",
 				"to configure it.")
@@ -585,70 +1329,147 @@ class Scoreboard:
 				"Please use \"Scoreboard.load_instructions\"",
 				"to configure it.")
 
-		# Keep track of the current pipeline stage of
-		# each dispatched & not completed instruction, in order
-		# to speed up the code execution
+		# Keep track of the current pipeline stage of each
+		# dispatched & not completed instruction (i.e. the active
+		# instruction window, without the completed instructions).
+		# Instructions are dispatched in program order, so the
+		# dictionary order is the PC order: the first key is the
+		# oldest active instruction.
 		inst_cur_stage = {}
 
 		# Some auxiliary constants to clean up & speed up the code
-		LAST_PIPELINE_STAGE = self.PIPELINE_STAGES[-1]
 		FIRST_PIPELINE_STAGE = self.PIPELINE_STAGES[0]
 
-		# Dispatched & not completed instruction window
+		# Oldest active instruction and most recently dispatched
+		# instruction PCs
 		cur_min_pc = 0
 		cur_max_pc = 0
 
+		# Dispatch the first instruction (which is read from the
+		# instruction stream, in streaming mode)
+		if self.__inst_available(cur_min_pc):
+			inst_cur_stage[cur_min_pc] = FIRST_PIPELINE_STAGE
+
+			if self.__ready_window is not None:
+				self.__ready_window.dispatch(cur_min_pc)
+
 		# Make sure the auxiliary unit for inner-clock changes
 		# is clean
-		self.__to_commit_this_clock = {}
-
-		while cur_min_pc < self.PROGRAM_SIZE:
+		self.__dirty_replicas.clear()
+		self.__waiters_to_commit.clear()
+
+		# Steady-state extrapolation (see "Scoreboard.__extrapolate_loop")
+		# looks at the scoreboard state whenever the oldest active
+		# instruction changes
+		extrapolate = self.extrapolate_loops and \
+			not self.record_history and not self.__streaming and \
+			self.change_sink is None
+		extrapolated = False
+		steady_states = {}
+		sampled_min_pc = cur_min_pc
+
+		# Instructions which left the pipeline in the current clock
+		completed_insts = []
+
+		while inst_cur_stage:
 			self.global_clock_timer += 1
 
-			# For each instruction between the not completed
-			# former and the most recently one dispatched...
-			for cur_inst_pc in range(cur_min_pc, cur_max_pc + self.WORD_SIZE, self.WORD_SIZE):
+			# For each active instruction, from the oldest one
+			# to the most recently dispatched (just the ones whose
+			# stage cost is satisfied, in case of the NumPy backend)...
+			if self.__ready_window is not None:
+				cur_inst_pcs = self.__ready_window.ready_insts(\
+					self.global_clock_timer)
+			else:
+				cur_inst_pcs = inst_cur_stage
+
+			for cur_inst_pc in cur_inst_pcs:
+				cur_inst_stage = inst_cur_stage[cur_inst_pc]
+
 				# Check the wait conditions of the current stage
-				# of the current instruction
-				if self.inst_status[cur_inst_pc][LAST_PIPELINE_STAGE] is None:
-					# Keep track of the current pipeline stage of
-					# each active (dispatched + not completed) instruction
-					if cur_inst_pc not in inst_cur_stage:
-						inst_cur_stage[cur_inst_pc] = FIRST_PIPELINE_STAGE
-					cur_inst_stage = inst_cur_stage[cur_inst_pc]
-
-					# If ready, proceed to the next stage
-					if self.__check_inst_ready(cur_inst_pc, cur_inst_stage):
-						new_inst_stage = self.__bookkeep(\
-								cur_inst_pc, 
-								cur_inst_stage)
-
-						# Update current instruction new pipeline stage
-						if new_inst_stage:
-							inst_cur_stage[cur_inst_pc] = new_inst_stage
-						else:
-							inst_cur_stage.pop(cur_inst_pc)
-
-			# Update PC interval
+				# of the current instruction. If ready, proceed to
+				# the next stage
+				if self.__check_inst_ready(cur_inst_pc, cur_inst_stage):
+					new_inst_stage = self.__bookkeep(\
+							cur_inst_pc, 
+							cur_inst_stage)
+
+					# Update current instruction new pipeline stage
+					if new_inst_stage:
+						inst_cur_stage[cur_inst_pc] = new_inst_stage
+					else:
+						completed_insts.append(cur_inst_pc)
+
+			# Remove the completed instructions from the window
+			if completed_insts:
+				for cur_inst_pc in completed_insts:
+					inst_cur_stage.pop(cur_inst_pc)
+				completed_insts.clear()
+
+			# Dispatch the next instruction as soon as the most
+			# recently dispatched one leaves the "issue" stage
+			if inst_cur_stage.get(cur_max_pc) != FIRST_PIPELINE_STAGE and\
+				self.__inst_available(cur_max_pc + self.WORD_SIZE):
+				cur_max_pc += self.WORD_SIZE
+				inst_cur_stage[cur_max_pc] = FIRST_PIPELINE_STAGE
+
+				if self.__ready_window is not None:
+					self.__ready_window.dispatch(cur_max_pc)
+
+			# Update the oldest active instruction PC
 			if inst_cur_stage:
-				cur_min_pc = min(inst_cur_stage)
-				cur_max_pc = max(inst_cur_stage)
-				if cur_max_pc + self.WORD_SIZE < self.PROGRAM_SIZE and\
-					inst_cur_stage[cur_max_pc] != FIRST_PIPELINE_STAGE:
-					cur_max_pc += self.WORD_SIZE
+				cur_min_pc = next(iter(inst_cur_stage))
 			else:
-				cur_min_pc = cur_max_pc = self.PROGRAM_SIZE
+				cur_min_pc = self.PROGRAM_SIZE
+
+			# No instruction changed its pipeline stage in this clock
+			idle_clock = not self.__dirty_replicas
 
 			# Commit all changes made in the current clock
 			self.__commit_changes()
 
+			if self.__streaming:
+				self.__retire_insts(cur_min_pc)
+
+			# The scoreboard state did not change, so the next
+			# clock cycles are idle until some in-flight instruction
+			# satisfies its current pipeline stage cost
+			if self.skip_idle_clocks and idle_clock and inst_cur_stage:
+				self.global_clock_timer = \
+					self.__next_event_clock(inst_cur_stage) - 1
+
+			if extrapolate and inst_cur_stage and cur_min_pc != sampled_min_pc:
+				pc_shift = self.__extrapolate_loop(steady_states,
+					inst_cur_stage,
+					cur_min_pc,
+					cur_max_pc)
+
+				if pc_shift:
+					extrapolated = True
+					cur_min_pc += pc_shift
+					cur_max_pc += pc_shift
+
+				sampled_min_pc = cur_min_pc
+
+		if self.history is not None:
+			self.history.untouched_register_count = \
+				len(self.architecture_registers) -\
+				sum(register_label in self.architecture_registers
+					for register_label in self.__reg_labels)
+
+		func_unit_status, reg_res_status = self.__build_answer()
+
 		# Produce final output
 		ans = {
 			"pipeline_stages" : self.PIPELINE_STAGES,
 			"inst_status" : self.inst_status,
-			"func_unit_status" : self.func_unit_status,
-			"reg_dest_status" : self.reg_res_status,
+			"func_unit_status" : func_unit_status,
+			"reg_dest_status" : reg_res_status,
 			"update_timers" : self.update_timers,
+			"history" : self.history,
 		}
 
+		if extrapolated and self.verify_extrapolation:
+			self.__verify_extrapolation(ans)
+
 		return ans
@@ -0,0 +1,314 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Design-space sweep over the functional unit
+	"quantity" and "clock_cycles" values of the
+	architecture defined in the "configme.py"
+	module. Every architecture variant runs the
+	whole set of given programs, and all variants
+	are spread among a pool of worker processes.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+import sys
+sys.path.insert(0, "../")
+from modules.readfile import ReadFile
+from modules.scoreboard import Scoreboard
+from modules.resultcache import ResultCache
+from itertools import product
+from multiprocessing import Pool
+
+# Worker process state, set up just once per worker
+# by "_init_worker" (see "sweep" function below)
+_worker_state = {}
+
+def architecture_variants(architecture, grid):
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Generate every architecture variant of the given
+		grid, which must follow the format below:
+
+		{
+			"functional-unit-name" : {
+				"quantity" : [int, int, ...],
+				"clock_cycles" : [int, int, ...],
+			},
+			...
+		}
+
+		Both "quantity" and "clock_cycles" are optional
+		for every functional unit (the architecture value
+		is kept if omitted). Each variant is just the
+		"functional_units" dictionary of the architecture
+		with the grid values applied.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	axes = []
+	for func_unit in grid:
+		if func_unit not in architecture["functional_units"]:
+			raise Exception("Unknown functional unit \"" +\
+				func_unit + "\" in the sweep grid.")
+
+		for field in ("quantity", "clock_cycles"):
+			for val in grid[func_unit].get(field, []):
+				if type(val) is not int or val <= 0:
+					raise Exception("Sweep grid \"" + field + "\" of \"" +\
+						func_unit + "\" must be a >= 1 integer (got " +\
+						str(val) + ").")
+
+			if field in grid[func_unit]:
+				axes.append([(func_unit, field, val)
+					for val in grid[func_unit][field]])
+
+	for combination in product(*axes):
+		func_units = {
+			func_unit : {**architecture["functional_units"][func_unit]}
+			for func_unit in architecture["functional_units"]
+		}
+
+		for func_unit, field, val in combination:
+			func_units[func_unit][field] = val
+
+		yield func_units
+
+def utilization(ans, instructions, func_units, word_size):
+	"""
+		Fraction of the clock cycles which each functional
+		unit kept its replicas busy, i.e. from the "issue"
+		pipeline stage until the "write_result" pipeline
+		stage (which releases the functional unit) of every
+		instruction which used it.
+	"""
+	total_cycles = ans["update_timers"][-1]
+
+	busy_cycles = {func_unit : 0 for func_unit in func_units}
+
+	for inst_id, inst in enumerate(instructions):
+		inst_status = ans["inst_status"][word_size * inst_id]
+		busy_cycles[inst["functional_unit"]] += \
+			inst_status["write_result"] - inst_status["issue"] + 1
+
+	return {
+		func_unit : busy_cycles[func_unit] /\
+			(total_cycles * func_units[func_unit]["quantity"])
+		for func_unit in func_units
+	}
+
+def _init_worker(architecture, programs, update_flags_stage):
+	_worker_state["architecture"] = architecture
+	_worker_state["programs"] = programs
+	_worker_state["update_flags_stage"] = update_flags_stage
+
+def _run_variant(task):
+	"""
+		Run all programs against a single architecture
+		variant, inside a worker process. Returns the rows
+		of every program, alongside the instruction status
+		table and update timers of the programs whose ids
+		are in "answer_program_ids".
+	"""
+	variant_id, func_units, program_ids, answer_program_ids = task
+
+	architecture = {
+		**_worker_state["architecture"],
+		"functional_units" : func_units,
+	}
+	programs = _worker_state["programs"]
+
+	sc = Scoreboard(update_flags_stage=_worker_state["update_flags_stage"],
+		record_history=False)
+	sc.load_architecture(architecture)
+
+	answers = sc.run_many([programs[program_id] for program_id in program_ids])
+
+	rows = [{
+		"variant" : variant_id,
+		"program" : program_id,
+		"functional_units" : func_units,
+		"total_cycles" : ans["update_timers"][-1],
+		"utilization" : utilization(ans,
+			programs[program_id],
+			func_units,
+			architecture["word_size"]),
+	} for program_id, ans in zip(program_ids, answers)]
+
+	return rows, {
+		program_id : {
+			"inst_status" : dict(ans["inst_status"]),
+			"update_timers" : ans["update_timers"],
+		}
+		for program_id, ans in zip(program_ids, answers)
+		if program_id in answer_program_ids
+	}
+
+def sweep(grid,
+	programs,
+	architecture=None,
+	update_flags_stage=True,
+	processes=None):
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Run every program (instruction lists, as returned
+		by "ReadFile.load_instructions") against every
+		architecture variant of the given grid (check out
+		"architecture_variants" for its format).
+
+		The variants are spread among "processes" worker
+		processes (all CPU cores, by default). Each worker
+		receives the programs just once, and reuses a single
+		scoreboard for all programs of a variant.
+
+		Every (variant, program) pair whose result is known
+		to be the same of a previous pair (see "ResultCache")
+		is not simulated at all: its row just copies the
+		results of the previous one if both hold the same
+		program. Otherwise, just the timing is the same (the
+		programs may use distinct functional units), so the
+		utilization is computed again from the instruction
+		status table of the previous one.
+
+		Returns the results table: a list of rows, sorted
+		by variant and program index, each one holding the
+		variant "functional_units", the "total_cycles" and
+		the "utilization" of every functional unit.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	if architecture is None:
+		architecture = ReadFile().load_architecture()
+
+	# The register set may be shared with "configme.py"
+	# module, so send workers a (picklable) copy of it
+	architecture = {
+		**architecture,
+		"registers" : set(architecture["registers"]),
+	}
+
+	pipeline_stages = Scoreboard.pipeline_stages(update_flags_stage)
+
+	result_cache = ResultCache()
+
+	# Programs do not change during the sweep, so each one
+	# is fingerprinted just once for every variant
+	fingerprints = [result_cache.fingerprint(instructions)
+		for instructions in programs]
+
+	# First (variant, program) pair of each result key
+	simulated = {}
+
+	# (variant, program) pairs with the same result of
+	# a previous one, which is given alongside
+	duplicates = []
+
+	# Program ids to be simulated, functional units of each
+	# variant, and the (variant, program) pairs whose answers
+	# are needed by duplicates holding other programs
+	variant_program_ids = []
+	variant_func_units = []
+	answer_pairs = set()
+
+	for variant_id, func_units in \
+		enumerate(architecture_variants(architecture, grid)):
+
+		variant = {**architecture, "functional_units" : func_units}
+
+		program_ids = []
+		for program_id, instructions in enumerate(programs):
+			key = result_cache.key(instructions,
+				variant,
+				pipeline_stages,
+				fingerprints[program_id])
+
+			if key in simulated:
+				duplicates.append((variant_id,
+					program_id,
+					func_units,
+					simulated[key]))
+
+				if simulated[key][1] != program_id:
+					answer_pairs.update({simulated[key]})
+			else:
+				simulated[key] = (variant_id, program_id)
+				program_ids.append(program_id)
+
+		variant_program_ids.append(program_ids)
+		variant_func_units.append(func_units)
+
+	tasks = [(variant_id,
+			variant_func_units[variant_id],
+			program_ids,
+			{program_id for program_id in program_ids
+				if (variant_id, program_id) in answer_pairs})
+		for variant_id, program_ids in enumerate(variant_program_ids)
+		if program_ids]
+
+	rows = {}
+	answers = {}
+
+	with Pool(processes,
+		initializer=_init_worker,
+		initargs=(architecture, programs, update_flags_stage)) as pool:
+
+		for variant_rows, variant_answers in \
+			pool.imap_unordered(_run_variant, tasks):
+
+			for row in variant_rows:
+				rows[(row["variant"], row["program"])] = row
+
+				if row["program"] in variant_answers:
+					answers[(row["variant"], row["program"])] = \
+						variant_answers[row["program"]]
+
+	for variant_id, program_id, func_units, simulated_pair in duplicates:
+		row = {
+			**rows[simulated_pair],
+			"variant" : variant_id,
+			"program" : program_id,
+			"functional_units" : func_units,
+		}
+
+		# Same timing of another program, which may use other
+		# functional units
+		if simulated_pair[1] != program_id:
+			row["utilization"] = utilization(answers[simulated_pair],
+				programs[program_id],
+				func_units,
+				architecture["word_size"])
+
+		rows[(variant_id, program_id)] = row
+
+	return [rows[pair] for pair in sorted(rows)]
+
+if __name__ == "__main__":
+	import json
+
+	if len(sys.argv) < 3:
+		print("usage:", sys.argv[0],
+			"<sweep_grid_json_filepath> <source_code_filepath> [...]")
+		exit(1)
+
+	with open(sys.argv[1]) as f:
+		grid = json.load(f)
+
+	rf = ReadFile()
+	architecture = rf.load_architecture()
+	programs = [rf.load_instructions(filepath, architecture, verify_reg=False)
+		for filepath in sys.argv[2:]]
+
+	table = sweep(grid, programs, architecture)
+
+	# Tab-separated results table
+	func_unit_labels = sorted(architecture["functional_units"])
+	print("variant", "program", "total_cycles",
+		*[func_unit + "_" + field
+			for func_unit in func_unit_labels
+			for field in ("quantity", "clock_cycles", "utilization")],
+		sep="\t")
+
+	for row in table:
+		print(row["variant"], sys.argv[2 + row["program"]], row["total_cycles"],
+			*[val
+				for func_unit in func_unit_labels
+				for val in (row["functional_units"][func_unit]["quantity"],
+					row["functional_units"][func_unit]["clock_cycles"],
+					"{:.4f}".format(row["utilization"][func_unit]))],
+			sep="\t")
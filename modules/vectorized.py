@@ -0,0 +1,191 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Optional NumPy backend of the scoreboard
+	readiness polling, which evaluates the
+	timing (and operand) conditions of all
+	in-flight instructions in a single
+	vectorized pass per clock cycle, for
+	architectures wide enough to keep hundreds
+	of instructions in flight.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+class ReadyWindow:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Arrays of the active instruction window, as a circular
+		buffer indexed by instruction id (PC // word size) modulo
+		the buffer capacity, which grows as needed to hold every
+		instruction from the oldest active one to the most
+		recently dispatched one:
+
+		active:		whether the instruction is in flight.
+		stage:		id of its current pipeline stage.
+		ready_clock:	clock cycle from which its current stage
+				cost is satisfied (0 in the "issue" stage,
+				which has no cost).
+		replica:	index of its functional unit replica (-1
+				in the "issue" stage).
+
+		Alongside the "r_j" and "r_k" flags of every functional
+		unit replica ("operands_ready"), which the scoreboard keeps
+		in sync as it commits changes.
+
+		Only readiness is evaluated here: the ready instructions are
+		still handled one by one (in program order) by the scoreboard,
+		which checks the remaining conditions against the committed
+		state and stages their changes until the end of the clock.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	def __init__(self, word_size, pipeline_stages, replica_num, capacity=64):
+		if numpy is None:
+			raise UserWarning("The NumPy backend needs the \"numpy\" package.",
+				"Please install it (e.g. \"pip install numpy\")",
+				"or disable the NumPy backend.")
+
+		self.word_size = word_size
+
+		# Id of each pipeline stage
+		self.STAGE_IDS = {
+			stage_label : stage_id
+			for stage_id, stage_label in enumerate(pipeline_stages)
+		}
+		self.ISSUE = self.STAGE_IDS["issue"]
+		self.READ_OPERANDS = self.STAGE_IDS["read_operands"]
+
+		# Last position stands for "no replica", which never
+		# waits for operands
+		self.operands_ready = numpy.ones(replica_num + 1, dtype=bool)
+
+		self.__allocate(capacity)
+
+	def __allocate(self, capacity):
+		self.capacity = capacity
+		self.active = numpy.zeros(capacity, dtype=bool)
+		self.stage = numpy.zeros(capacity, dtype=numpy.int8)
+		self.ready_clock = numpy.zeros(capacity, dtype=numpy.int64)
+		self.replica = numpy.full(capacity, -1, dtype=numpy.int64)
+
+		# Oldest active and most recently dispatched instruction ids
+		self.min_id = 0
+		self.max_id = -1
+
+	def __slots(self):
+		"""
+			Buffer positions of every instruction id from the
+			oldest active one to the most recently dispatched
+			one, in program order.
+		"""
+		return numpy.arange(self.min_id, self.max_id + 1) % self.capacity
+
+	def __grow(self):
+		slots = self.__slots()
+		min_id = self.min_id
+		max_id = self.max_id
+
+		active = self.active[slots]
+		stage = self.stage[slots]
+		ready_clock = self.ready_clock[slots]
+		replica = self.replica[slots]
+
+		self.__allocate(2 * self.capacity)
+
+		new_slots = numpy.arange(min_id, max_id + 1) % self.capacity
+		self.active[new_slots] = active
+		self.stage[new_slots] = stage
+		self.ready_clock[new_slots] = ready_clock
+		self.replica[new_slots] = replica
+
+		self.min_id = min_id
+		self.max_id = max_id
+
+	def clear(self):
+		"""
+			Remove every instruction (keeping the replica flags).
+		"""
+		self.__allocate(self.capacity)
+
+	def dispatch(self, inst_pc):
+		"""
+			Add a new instruction, in the "issue" stage. Instructions
+			must be dispatched in program order.
+		"""
+		inst_id = inst_pc // self.word_size
+
+		if self.max_id < self.min_id:
+			self.min_id = inst_id
+		self.max_id = inst_id
+
+		if self.max_id - self.min_id >= self.capacity:
+			self.__grow()
+
+		slot = inst_id % self.capacity
+		self.active[slot] = True
+		self.stage[slot] = self.ISSUE
+		self.ready_clock[slot] = 0
+		self.replica[slot] = -1
+
+	def advance(self, inst_pc, stage_label, ready_clock, replica_index):
+		"""
+			Move an instruction to the given pipeline stage.
+		"""
+		slot = (inst_pc // self.word_size) % self.capacity
+		self.stage[slot] = self.STAGE_IDS[stage_label]
+		self.ready_clock[slot] = ready_clock
+		self.replica[slot] = replica_index
+
+	def retire(self, inst_pc):
+		"""
+			Remove a completed instruction.
+		"""
+		self.active[(inst_pc // self.word_size) % self.capacity] = False
+
+		while self.min_id <= self.max_id and \
+			not self.active[self.min_id % self.capacity]:
+			self.min_id += 1
+
+	def ready_insts(self, clock):
+		"""
+			PCs of the in-flight instructions whose current stage
+			cost is satisfied in the given clock cycle (and, in the
+			"read_operands" stage, whose operands are ready), in
+			program order.
+		"""
+		if self.max_id < self.min_id:
+			return []
+
+		slots = self.__slots()
+		stage = self.stage[slots]
+
+		ready = self.active[slots] & (self.ready_clock[slots] <= clock) &\
+			((stage != self.READ_OPERANDS) |\
+				self.operands_ready[self.replica[slots]])
+
+		return ((numpy.flatnonzero(ready) + self.min_id) *\
+			self.word_size).tolist()
+
+	def next_ready_clock(self, clock):
+		"""
+			Earliest clock cycle after the given one in which the
+			stage cost of some in-flight instruction is satisfied,
+			or None if there is no pending stage cost.
+		"""
+		if self.max_id < self.min_id:
+			return None
+
+		slots = self.__slots()
+		ready_clock = self.ready_clock[slots]
+
+		pending = self.active[slots] & (self.stage[slots] != self.ISSUE) &\
+			(ready_clock > clock)
+
+		if not pending.any():
+			return None
+
+		return int(ready_clock[pending].min())
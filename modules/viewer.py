@@ -0,0 +1,397 @@
+"""
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	MODULE SYNTHESIS:
+	Interactive terminal viewer of a recorded
+	simulation, which moves back and forth
+	through its clock cycles (jumping straight
+	to any of them), searches for instructions
+	and registers, and runs until the next
+	instruction issue stall.
+	~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+class StageIndex:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Instruction status table sorted by clock cycle: for
+		each pipeline stage, the PC of every instruction sorted
+		by the clock cycle in which it completed that stage,
+		alongside those clock cycles. So the instructions which
+		completed some pipeline stage in any given clock cycle
+		are found with a bisect per pipeline stage, instead of
+		scanning the whole table.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+	def __init__(self, inst_status, pipeline_stages):
+		self.pipeline_stages = pipeline_stages
+
+		pcs = sorted(inst_status)
+
+		# Clock cycle of each pipeline stage of each instruction,
+		# in program order (-1 if the stage was never reached)
+		stage_clocks = {stage_label : array("q")
+			for stage_label in pipeline_stages}
+
+		for pc in pcs:
+			cur_inst_status = inst_status[pc]
+			for stage_label in pipeline_stages:
+				val = cur_inst_status[stage_label]
+				stage_clocks[stage_label].append(val if val is not None else -1)
+
+		self.pcs = {}
+		self.clocks = {}
+
+		for stage_label in pipeline_stages:
+			clocks = stage_clocks[stage_label]
+			inst_order = sorted(range(len(pcs)), key=clocks.__getitem__)
+
+			self.pcs[stage_label] = array("q", (pcs[i] for i in inst_order))
+			self.clocks[stage_label] = array("q",
+				(clocks[i] for i in inst_order))
+
+	def insts_at(self, clock):
+		"""
+			Set of PCs of the instructions which completed any
+			pipeline stage in the given clock cycle.
+		"""
+		pcs = set()
+
+		for stage_label in self.pipeline_stages:
+			clocks = self.clocks[stage_label]
+			pcs.update(self.pcs[stage_label][\
+				bisect_left(clocks, clock):bisect_right(clocks, clock)])
+
+		return pcs
+
+	def next_issue_stall(self, clock):
+		"""
+			First instruction issue stall starting after the given
+			clock cycle, i.e. the clock cycles in which no instruction
+			was issued, even though some instructions were still
+			waiting to be issued. Returns the first and last stalled
+			clock cycles, alongside the PC of the instruction waiting
+			to be issued, or None if there is no such stall.
+		"""
+		clocks = self.clocks["issue"]
+
+		# Only stalls starting after the given clock cycle,
+		# i.e. right after an issue in it or later
+		inst_id = bisect_left(clocks, clock)
+
+		while inst_id + 1 < len(clocks):
+			if clocks[inst_id] >= 0 and \
+				clocks[inst_id + 1] > clocks[inst_id] + 1:
+				return (clocks[inst_id] + 1,
+					clocks[inst_id + 1] - 1,
+					self.pcs["issue"][inst_id + 1])
+
+			inst_id += 1
+
+		return None
+
+class RegisterIndex:
+	"""
+		Clock cycles in which the result status of each register
+		changed, sorted (just like the change log), by register
+		id, so the next change of any register after any clock
+		cycle is found with a bisect, instead of scanning the
+		change log.
+	"""
+	def __init__(self, history):
+		fields_num = len(history.FIELDS)
+
+		self.clocks = {}
+
+		for field_id, clock in zip(history.field, history.clock):
+			if field_id >= fields_num:
+				self.clocks.setdefault(field_id - fields_num,
+					array("q")).append(clock)
+
+	def next_change(self, register_id, clock):
+		"""
+			First clock cycle after the given one in which the
+			result status of the given register changed, or
+			None if there is no such clock cycle.
+		"""
+		clocks = self.clocks.get(register_id, ())
+
+		change_id = bisect_right(clocks, clock)
+		if change_id < len(clocks):
+			return clocks[change_id]
+
+		return None
+
+class TimeTravelViewer:
+	"""
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+		Interactive viewer of an answer (as returned by
+		"Scoreboard.run", or by "ResultFile.answer") with
+		the scoreboard history recorded.
+
+		The scoreboard state is kept at the current clock
+		cycle: moving forward replays just the changes logged
+		since then, and every other move starts from the
+		nearest history snapshot ("ScoreboardHistory.state_at"),
+		so no move replays the simulation from its beginning.
+		Just the instructions in flight (alongside the ones
+		completing some pipeline stage, found in the
+		"StageIndex", and the searched ones) are shown, and
+		registers are searched in the "RegisterIndex", so
+		each move costs about the changes near the new clock
+		cycle, whatever the program size.
+		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	"""
+
+	HELP = """Commands:
+	[n]ext [k]		move forward k clock cycles with changes (1 by default, also ENTER)
+	[b]ack [k]		move back k clock cycles with changes (1 by default)
+	[g]oto <clock>		jump to the given clock cycle
+	pc <pc>			show the given instruction from now on, and jump to the next clock
+				cycle in which it completes a pipeline stage
+	reg <register>		jump to the next clock cycle in which the given register result
+				status changes
+	[s]tall			run until the next clock cycle in which no instruction can be issued
+	[c]lear			stop showing the instructions shown by "pc"
+	[h]elp			show this message
+	[q]uit			leave the viewer"""
+
+	def __init__(self, ans, interface, colored=True):
+		self.ans = ans
+		self.interface = interface
+		self.colored = colored
+
+		self.history = ans["history"]
+
+		if self.history is None:
+			raise UserWarning("Can't find the scoreboard history.",
+				"Please enable \"record_history\" in the",
+				"Scoreboard to use the time-travel viewer.")
+
+		self.update_timers = ans["update_timers"]
+		self.final_clock = self.update_timers[-1] + 1
+
+		self.stage_index = StageIndex(ans["inst_status"],
+			ans["pipeline_stages"])
+
+		self.register_index = RegisterIndex(self.history)
+
+		# Instructions always shown (see the "pc" command)
+		self.shown_pcs = set()
+
+		self.state = self.history.state_at(self.update_timers[0])
+
+	def goto(self, clock):
+		"""
+			Move the scoreboard state to the given clock cycle.
+		"""
+		clock = min(max(clock, 0), self.final_clock)
+
+		snapshot_clocks = self.history.snapshot_clocks
+
+		# Replay the changes since the current clock cycle only
+		# if no snapshot is any closer to the new one
+		if clock >= self.state.clock and \
+			bisect_right(snapshot_clocks, clock) == \
+			bisect_right(snapshot_clocks, self.state.clock):
+			self.state.advance(clock)
+		else:
+			self.state = self.history.state_at(clock)
+
+	def step(self, steps):
+		"""
+			Move forward (or back, if "steps" is negative) the
+			given number of clock cycles with changes.
+		"""
+		update_timers = self.update_timers
+		clock = self.state.clock
+
+		if steps > 0:
+			timer_id = bisect_right(update_timers, clock) + steps - 1
+			self.goto(update_timers[timer_id]
+				if timer_id < len(update_timers) else self.final_clock)
+
+		else:
+			timer_id = bisect_left(update_timers, clock) + steps
+			self.goto(update_timers[max(timer_id, 0)])
+
+	def __view_pcs(self):
+		"""
+			Instructions in flight in the current clock cycle,
+			alongside the ones completing some pipeline stage
+			in it and the searched ones, in program order.
+		"""
+		state = self.state
+
+		pcs = self.stage_index.insts_at(state.clock) | self.shown_pcs
+
+		for replica_index in range(len(self.history.replica_keys)):
+			if state.func_unit_field(replica_index, "busy"):
+				pcs.update({state.func_unit_field(replica_index, "op")})
+
+		return sorted(pcs)
+
+	def show(self):
+		"""
+			Print the tables of the current clock cycle.
+		"""
+		clock = self.state.clock
+
+		if clock == self.final_clock:
+			title = "Final state"
+		else:
+			title = "State for clock cycle " + str(clock) +\
+				" of " + str(self.final_clock - 1) + " total"
+
+			if bisect_left(self.update_timers, clock) ==\
+				bisect_right(self.update_timers, clock):
+				title += " (no changes)"
+
+		self.interface.print_state(self.ans,
+			self.state,
+			self.__view_pcs(),
+			title,
+			colored=self.colored and clock != self.final_clock)
+
+	def __search_pc(self, pc):
+		inst_status = self.ans["inst_status"]
+
+		if pc not in inst_status:
+			print("There is no instruction with PC", str(pc) + ".")
+			return False
+
+		cur_inst_status = inst_status[pc]
+
+		print("PC", str(pc) + ":", ", ".join(stage_label + " " +\
+			str(cur_inst_status[stage_label])
+			for stage_label in self.ans["pipeline_stages"]))
+
+		self.shown_pcs.update({pc})
+
+		stage_clocks = [cur_inst_status[stage_label]
+			for stage_label in self.ans["pipeline_stages"]
+			if cur_inst_status[stage_label] is not None and\
+				cur_inst_status[stage_label] > self.state.clock]
+
+		if not stage_clocks:
+			print("No pipeline stage completed after clock cycle",
+				str(self.state.clock) + ".")
+			return False
+
+		self.goto(min(stage_clocks))
+		return True
+
+	def __search_register(self, register_label):
+		history = self.history
+
+		if register_label not in history.register_labels:
+			print("Register", register_label, "is never used.")
+			return False
+
+		clock = self.register_index.next_change(\
+			history.register_labels.index(register_label),
+			self.state.clock)
+
+		if clock is not None:
+			self.goto(clock)
+			return True
+
+		print("Register", register_label,
+			"result status does not change after clock cycle",
+			str(self.state.clock) + ".")
+		return False
+
+	def __search_stall(self):
+		stall = self.stage_index.next_issue_stall(self.state.clock)
+
+		if stall is None:
+			print("No instruction issue stall after clock cycle",
+				str(self.state.clock) + ".")
+			return False
+
+		first_clock, last_clock, pc = stall
+
+		print("Instruction issue stalled from clock cycle", first_clock,
+			"to", str(last_clock) + ": PC", pc, "waits to be issued.")
+
+		self.shown_pcs.update({pc})
+		self.goto(first_clock)
+		return True
+
+	def command(self, line):
+		"""
+			Run a single viewer command. Returns False if the
+			viewer must be left.
+		"""
+		args = line.split()
+		if not args:
+			args = ["n"]
+
+		command = args[0].lower()
+
+		try:
+			if command in {"q", "quit", "exit"}:
+				return False
+
+			if command in {"h", "help", "?"}:
+				print(self.HELP)
+				return True
+
+			if command in {"c", "clear"}:
+				self.shown_pcs.clear()
+				moved = True
+
+			elif command in {"n", "next"}:
+				self.step(int(args[1]) if len(args) > 1 else 1)
+				moved = True
+
+			elif command in {"b", "back"}:
+				self.step(-(int(args[1]) if len(args) > 1 else 1))
+				moved = True
+
+			elif command in {"g", "goto"}:
+				self.goto(int(args[1]))
+				moved = True
+
+			elif command == "pc":
+				moved = self.__search_pc(int(args[1]))
+
+			elif command == "reg":
+				moved = self.__search_register(args[1])
+
+			elif command in {"s", "stall"}:
+				moved = self.__search_stall()
+
+			else:
+				print("Unknown command \"" + command + "\"",
+					"(\"help\" shows every command).")
+				moved = False
+
+		except (IndexError, ValueError):
+			print("Invalid arguments for \"" + command + "\"",
+				"(\"help\" shows every command).")
+			moved = False
+
+		if moved:
+			self.show()
+
+		return True
+
+	def run(self):
+		"""
+			Show the first clock cycle and run commands read
+			from the standard input until the viewer is left.
+		"""
+		print(self.HELP)
+		self.show()
+
+		while True:
+			try:
+				line = input("\n[clock " + str(self.state.clock) + "] > ")
+			except EOFError:
+				break
+
+			if not self.command(line):
+				break
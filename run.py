@@ -2,6 +2,10 @@ from configme import Config
 from modules.readfile import ReadFile
 from modules.scoreboard import Scoreboard
 from modules.interface import TextualInterface
+from modules.export import TraceExporter
+from modules.resultfile import ResultFile, save_result, is_result_file
+from modules.viewer import TimeTravelViewer
+from modules.program import is_compiled_program
 from textwrap import dedent
 
 if __name__ == "__main__":
@@ -9,12 +13,15 @@ if __name__ == "__main__":
 
 	if "--help" in sys.argv or "-h" in sys.argv or len(sys.argv) < 2:
 		print("usage:", sys.argv[0], 
-			"<source_code_filepath>",
-			"[--checkreg] [--nogui] [--complete] [--nocolor] [--noufstage] [--clockstep n]\n",
+			"<source_code_filepath> [<source_code_filepath> ...]",
+			"[--checkreg] [--nogui] [--complete] [--nocolor] [--noufstage] [--stream] [--verifyloops] [--numpy] [--diff] [--viewer] [--clockstep n] [--keyframe n] [--cachedir dir] [--jsonl file] [--csv file] [--save file]\n",
 			dedent("""
 			Where:
 			<source_code_filepath>: full filepath of MIPS assembly-like input file. 
 						Please check out "./test-cases/" subdirectory for input file format examples.
+						A compiled program (see "python -m modules.program") may be given instead.
+						Several filepaths may be given, and all of them will be simulated
+						against the same architecture, one after another.
 
 			Optional flags:
 			--checkreg	: accepts only registers declared in architecture defined in Configme.py module.
@@ -27,11 +34,40 @@ if __name__ == "__main__":
 					the same clock cycle while the first one write in a register and the second one read from it. 
 					If this flag is enabled, the functional unit flag updating  will be done in the "write_result" 
 					pipeline stage instead.
+			--stream	: read the input file lazily and print each instruction status (tab-separated) 
+					as soon as it retires, so huge input files can be simulated with bounded memory. 
+					The "--complete" flag has no effect in this mode. Result files (see "--save") are 
+					printed in the same format, without being simulated again.
+			--verifyloops	: simulate again, without steady-state loop extrapolation, every input file whose 
+					repeated loop iterations were extrapolated, and check if both results match.
+			--numpy		: check which in-flight instructions are ready with NumPy vectorized operations 
+					(needs the "numpy" package). Pays off only for very wide architectures, with 
+					hundreds of instructions in flight.
+			--diff		: print just the changed cells of each clock cycle, instead of the whole tables (which
+					are still printed every "--keyframe" clock cycles). Makes sense only if used together 
+					with "--complete" flag.
+			--viewer	: open an interactive viewer of the simulation instead of printing it, which moves back 
+					and forth through the clock cycles, jumps straight to any of them, searches for instructions 
+					and registers and runs until the next instruction issue stall (type "help" in it for every 
+					command). Records the whole history, just like "--complete". The "--stream" flag ignores it.
 
 			Optional arguments:
 			--clockstep	: (positive integer) specify how many clock cycles must be shown each iteration. If omitted, 
 					then all cycles will be printed by default. This argument only makes sense if used together 
 					with "--complete" flag.
+			--keyframe	: (positive integer) with the "--diff" flag, print the whole tables every n printed 
+					clock cycles (100 by default).
+			--cachedir	: (directory) keep parsed input files cached in the given directory, so an input 
+					file is parsed again only if it (or the configuration in "configme.py") changes.
+			--jsonl		: (file) write every change of the simulation (instruction pipeline stages, functional 
+					unit fields and register result status) to the given file as JSON Lines, while the 
+					simulation runs.
+			--csv		: (file) write the instruction status table to the given file as CSV, while the 
+					simulation runs.
+			--save		: (file) save the result (with the whole change log, if "--complete" is given) to 
+					the given binary result file, which may be given later in place of the input file, 
+					so it is shown without being simulated again. If several input files are given, 
+					the result of the n-th one is saved to "file.n".
 			"""))
 		exit(1)
 
@@ -45,6 +81,11 @@ if __name__ == "__main__":
 	full_output = "--complete" in sys.argv
 	colored_output = "--nocolor" not in sys.argv
 	update_flags_stage = "--noufstage" not in sys.argv
+	stream = "--stream" in sys.argv
+	verify_loops = "--verifyloops" in sys.argv
+	numpy_backend = "--numpy" in sys.argv
+	diff_output = "--diff" in sys.argv
+	viewer = "--viewer" in sys.argv
 
 	clock_steps = -1
 	if "--clockstep" in sys.argv:
@@ -56,37 +97,224 @@ if __name__ == "__main__":
 			print("\"--clockstep\" argument demands"+\
 				" a positive integer as parameter")
 			exit(2)
+
+	keyframe_interval = 100
+	if "--keyframe" in sys.argv:
+		try:
+			keyframe_interval = int(sys.argv[1 + sys.argv.index("--keyframe")])
+			if keyframe_interval <= 0:
+				raise Exception
+		except:
+			print("\"--keyframe\" argument demands"+\
+				" a positive integer as parameter")
+			exit(2)
+
+	cache_dir = None
+	if "--cachedir" in sys.argv:
+		try:
+			cache_dir = sys.argv[1 + sys.argv.index("--cachedir")]
+		except:
+			print("\"--cachedir\" argument demands"+\
+				" a directory as parameter")
+			exit(2)
+
+	save_filepath = None
+	if "--save" in sys.argv:
+		try:
+			save_filepath = sys.argv[1 + sys.argv.index("--save")]
+		except:
+			print("\"--save\" argument demands"+\
+				" a filepath as parameter")
+			exit(2)
+
+	export_filepaths = {}
+	for export_arg in ("--jsonl", "--csv"):
+		if export_arg in sys.argv:
+			try:
+				export_filepaths[export_arg] = \
+					sys.argv[1 + sys.argv.index(export_arg)]
+			except:
+				print("\"" + export_arg + "\" argument demands"+\
+					" a filepath as parameter")
+				exit(2)
+
+	# Every non-flag argument (except the "--clockstep",
+	# "--keyframe", "--cachedir", "--jsonl", "--csv" and
+	# "--save" parameters) is an input source code filepath
+	filepaths = [arg for arg_index, arg in enumerate(sys.argv[1:], 1)
+		if not arg.startswith("--") and \
+		sys.argv[arg_index - 1] not in {"--clockstep", "--keyframe",
+			"--cachedir", "--jsonl", "--csv", "--save"}]
 	"""
 		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 		END OF Setting up program arguments
 		~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	"""
 
-	rf = ReadFile()
+	rf = ReadFile(cache_dir=cache_dir)
 
 	# Load architecture from configme.py module
 	architecture = rf.load_architecture()
 
-	# Load instructions from given assembly input
-	# file source code
-	inst_list = rf.load_instructions(\
-		sys.argv[1], 
-		architecture, 
-		verify_reg=checkreg)
+	# Machine-readable export, written while the simulation runs
+	trace_exporter = None
+	if export_filepaths:
+		export_files = {export_arg : open(export_filepaths[export_arg], "w",
+				newline="" if export_arg == "--csv" else None)
+			for export_arg in export_filepaths}
+
+		trace_exporter = TraceExporter(\
+			Scoreboard.pipeline_stages(update_flags_stage),
+			architecture["word_size"],
+			jsonl_file=export_files.get("--jsonl"),
+			csv_file=export_files.get("--csv"),
+			program_column=len(filepaths) > 1)
+
+	if stream:
+		# No history is recorded, so the memory used is bounded
+		# by the dispatched instruction window
+		sc = Scoreboard(update_flags_stage=update_flags_stage,
+			record_history=False,
+			numpy_backend=numpy_backend,
+			change_sink=trace_exporter)
+		sc.load_architecture(architecture)
+
+		def print_retired_inst(pc, inst_pack, inst_status):
+			print(pc, *[inst_status[stage_label]
+				for stage_label in sc.PIPELINE_STAGES], sep="\t")
+
+		for filepath in filepaths:
+			if len(filepaths) > 1:
+				print("==>", filepath, "<==")
 
-	sc = Scoreboard(update_flags_stage=update_flags_stage)
+			# Stored results are just printed in the same format,
+			# and not simulated again
+			if is_result_file(filepath):
+				with ResultFile(filepath) as result:
+					ans = result.answer()
+
+					print("PC", *ans["pipeline_stages"], sep="\t")
+					for pc in ans["inst_status"]:
+						print(pc, *[ans["inst_status"][pc][stage_label]
+							for stage_label in ans["pipeline_stages"]], sep="\t")
+					print("Total clock cycles:", ans["update_timers"][-1])
+
+				continue
+
+			sc.reset()
+			if trace_exporter is not None:
+				trace_exporter.start(filepath)
+
+			if is_compiled_program(filepath):
+				instructions = iter(rf.load_compiled_program(\
+					filepath, 
+					architecture, 
+					verify_reg=checkreg))
+			else:
+				instructions = rf.iter_instructions(\
+					filepath, 
+					architecture, 
+					verify_reg=checkreg)
+
+			sc.load_instruction_stream(instructions, 
+				sink=print_retired_inst)
+
+			print("PC", *sc.PIPELINE_STAGES, sep="\t")
+			ans = sc.run()
+			print("Total clock cycles:", ans["update_timers"][-1])
+
+		if trace_exporter is not None:
+			for export_file in export_files.values():
+				export_file.close()
+
+		exit(0)
+
+	# Stored results are just loaded (memory-mapped), and
+	# not simulated again
+	stored_answers = {filepath : ResultFile(filepath).answer()
+		for filepath in filepaths if is_result_file(filepath)}
+
+	for filepath in stored_answers:
+		if save_filepath is not None:
+			print("\"" + filepath + "\" is already a result file,"+\
+				" so it can not be given together with \"--save\"")
+			exit(2)
+
+		if (full_output or viewer) and stored_answers[filepath]["history"] is None:
+			print("\"" + filepath + "\" result file was saved without"+\
+				" the change log, which is needed by \"--complete\" and"+\
+				" \"--viewer\". Please simulate the input file again"+\
+				" with \"--complete --save\".")
+			exit(2)
+
+	sim_filepaths = [filepath for filepath in filepaths
+		if filepath not in stored_answers]
+
+	# Load instructions from each given assembly input
+	# file source code (compiled programs are memory-mapped
+	# instead)
+	inst_lists = [rf.load_compiled_program(\
+			filepath, 
+			architecture, 
+			verify_reg=checkreg)
+		if is_compiled_program(filepath) else
+		rf.load_instructions(\
+			filepath, 
+			architecture, 
+			verify_reg=checkreg)
+		for filepath in sim_filepaths]
+
+	# The step-by-step history of the scoreboard is
+	# needed only by the complete output and the viewer
+	sc = Scoreboard(update_flags_stage=update_flags_stage,
+		record_history=full_output or viewer,
+		verify_extrapolation=verify_loops,
+		numpy_backend=numpy_backend,
+		change_sink=trace_exporter)
 
 	# Load architecture to the scoreboard module
 	sc.load_architecture(architecture)
 	
-	# Load instruction set to the scoreboard module
-	sc.load_instructions(inst_list)
+	# Run every instruction set, reusing the scoreboard
+	# built for the architecture
+	if trace_exporter is None:
+		answers = sc.run_many(inst_lists)
+	else:
+		answers = []
+		for filepath, instructions in zip(sim_filepaths, inst_lists):
+			trace_exporter.start(filepath)
+			answers += sc.run_many([instructions])
 
-	ans = sc.run()
+		for export_file in export_files.values():
+			export_file.close()
+
+	if save_filepath is not None:
+		for filepath, ans in zip(sim_filepaths, answers):
+			save_result(ans,
+				save_filepath if len(filepaths) == 1 else\
+					save_filepath + "." + str(1 + filepaths.index(filepath)),
+				architecture["word_size"])
+
+	# Answers back in the input order
+	answers = iter(answers)
+	answers = [stored_answers[filepath] if filepath in stored_answers
+		else next(answers)
+		for filepath in filepaths]
 	
 	if nogui:
-		ti = TextualInterface(ans)
-		ti.print_answer(ans, 
-			full=full_output, 
-			clock_steps=clock_steps,
-			colored=colored_output)
+		for filepath, ans in zip(filepaths, answers):
+			if len(filepaths) > 1:
+				print("==>", filepath, "<==")
+
+			ti = TextualInterface(ans)
+
+			if viewer:
+				TimeTravelViewer(ans, ti, colored=colored_output).run()
+				continue
+
+			ti.print_answer(ans, 
+				full=full_output, 
+				clock_steps=clock_steps,
+				colored=colored_output,
+				diff=diff_output,
+				keyframe_interval=keyframe_interval)